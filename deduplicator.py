@@ -5,10 +5,29 @@ Manages job persistence and prevents duplicate notifications.
 """
 
 import sqlite3
-from typing import List, Dict, Optional
-from datetime import datetime
+import threading
+from typing import Iterator, List, Dict, Optional, Set, Tuple
+from datetime import datetime, timedelta
 import hashlib
 import json
+from pathlib import Path
+
+# Pre-initialized 128-bit BLAKE2b context; copy() skips the per-call
+# algorithm lookup
+_HASH_PROTO = hashlib.blake2b(digest_size=16, usedforsecurity=False)
+
+# Schema version kept in PRAGMA user_version; 1 = BLAKE2b job hashes
+# (version 0 databases hold 64-char SHA-256 hashes)
+_SCHEMA_VERSION = 1
+
+# Duplicates are rejected atomically by the UNIQUE job_hash index
+_INSERT_JOB_SQL = '''
+    INSERT OR IGNORE INTO jobs (
+        job_hash, title, company, location, category, source, url,
+        description, posted_date, discovered_date, sponsor_confidence,
+        entry_level_reasoning, score
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
 
 
 class JobDatabase:
@@ -16,11 +35,76 @@ class JobDatabase:
     
     def __init__(self, db_path: str = 'jobs.db'):
         self.db_path = db_path
+        self._local = threading.local()
         self._init_database()
     
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        Open a connection with the per-connection pragmas applied.
+        
+        WAL journal mode is persisted in the database file, but synchronous,
+        temp_store, mmap_size, cache_size and busy_timeout must be set on
+        every new connection.
+        
+        Args:
+            read_only: Open in autocommit mode=ro, for query-only use
+            
+        Returns:
+            Configured SQLite connection
+        """
+        if read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+        else:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript('''
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=3000;
+        ''')
+        return conn
+    
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Persistent read-write connection for the calling thread, opened on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+    
+    @property
+    def _ro_conn(self) -> sqlite3.Connection:
+        """Persistent read-only connection for the calling thread, opened on first use."""
+        # A second connection to :memory: would be a different, empty database
+        if self.db_path == ':memory:':
+            return self._conn
+        
+        conn = getattr(self._local, 'ro_conn', None)
+        if conn is None:
+            conn = self._connect(read_only=True)
+            self._local.ro_conn = conn
+        return conn
+    
+    def close(self):
+        """Optimize and close the calling thread's connections."""
+        ro_conn = getattr(self._local, 'ro_conn', None)
+        if ro_conn is not None:
+            ro_conn.close()
+            self._local.ro_conn = None
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.execute('PRAGMA optimize')
+            conn.close()
+            self._local.conn = None
+    
     def _init_database(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cursor = conn.cursor()
         
         # Jobs table
@@ -50,13 +134,83 @@ class JobDatabase:
             CREATE INDEX IF NOT EXISTS idx_job_hash ON jobs(job_hash)
         ''')
         
-        # Create index on sent_in_digest for filtering
+        # Composite index on (sent_in_digest, score) so the unsent digest
+        # query walks rows in score order without a separate sort; it
+        # supersedes the old single-column idx_sent_digest
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_sent_digest ON jobs(sent_in_digest)
+            CREATE INDEX IF NOT EXISTS idx_unsent_score ON jobs(sent_in_digest, score DESC)
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_sent_digest')
+        
+        # Index on discovered_date so cleanup is a range scan
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_discovered ON jobs(discovered_date)
+        ''')
+        
+        # Classification cache so repeated postings skip the LLM
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS classifications (
+                job_hash TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                is_entry_level INTEGER NOT NULL,
+                reasoning TEXT
+            )
+        ''')
+        
+        # Sponsorship text-signal cache so reruns skip the LLM; job_hash
+        # holds "<job hash>:<description hash>" and ts (Unix seconds) lets
+        # stale entries be re-checked
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sponsor_cache (
+                job_hash TEXT PRIMARY KEY,
+                signal TEXT NOT NULL,
+                reasoning TEXT,
+                ts INTEGER NOT NULL
+            )
         ''')
         
         conn.commit()
-        conn.close()
+        
+        if conn.execute('PRAGMA user_version').fetchone()[0] < _SCHEMA_VERSION:
+            self._migrate_job_hashes(conn)
+    
+    def _migrate_job_hashes(self, conn: sqlite3.Connection):
+        """
+        Rehash jobs stored with SHA-256 hashes and bump the schema version.
+        
+        Legacy rows whose normalized company and title now collide keep the
+        lowest id; the rest are deleted. Cached classifications follow their
+        job's new hash; classifications with no stored job and all legacy
+        sponsor signals (keyed without a description hash) are dropped and
+        recomputed. Runs as one transaction.
+        """
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                'SELECT id, job_hash, company, title FROM jobs WHERE length(job_hash) = 64 ORDER BY id'
+            ).fetchall()
+            taken = {
+                row[0] for row in conn.execute('SELECT job_hash FROM jobs WHERE length(job_hash) != 64')
+            }
+            
+            updates = []
+            duplicate_ids = []
+            cache_moves = []
+            for job_id, old_hash, company, title in rows:
+                new_hash = self._generate_job_hash({'company': company, 'title': title})
+                cache_moves.append((new_hash, old_hash))
+                if new_hash in taken:
+                    duplicate_ids.append((job_id,))
+                else:
+                    taken.add(new_hash)
+                    updates.append((new_hash, job_id))
+            
+            conn.executemany('DELETE FROM jobs WHERE id = ?', duplicate_ids)
+            conn.executemany('UPDATE jobs SET job_hash = ? WHERE id = ?', updates)
+            conn.executemany('UPDATE OR REPLACE classifications SET job_hash = ? WHERE job_hash = ?', cache_moves)
+            conn.execute('DELETE FROM classifications WHERE length(job_hash) = 64')
+            conn.execute('DELETE FROM sponsor_cache WHERE length(job_hash) = 64')
+            conn.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
     
     def _generate_job_hash(self, job: Dict) -> str:
         """
@@ -66,15 +220,19 @@ class JobDatabase:
             job: Job dictionary
             
         Returns:
-            SHA256 hash string
+            32-char BLAKE2b hex digest
         """
         # Normalize company and title
-        company = job.get('company', '').lower().strip()
-        title = job.get('title', '').lower().strip()
-        
-        # Create hash from company + title
-        hash_input = f"{company}|{title}"
-        return hashlib.sha256(hash_input.encode()).hexdigest()
+        company = job.get('company', '').strip().casefold().encode()
+        title = job.get('title', '').strip().casefold().encode()
+        
+        # Hash "company|title" (a dedup key, not a security hash); feeding
+        # the parts separately avoids building the joined string
+        h = _HASH_PROTO.copy()
+        h.update(company)
+        h.update(b'|')
+        h.update(title)
+        return h.hexdigest()
     
     def is_duplicate(self, job: Dict) -> bool:
         """
@@ -88,16 +246,30 @@ class JobDatabase:
         """
         job_hash = self._generate_job_hash(job)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._ro_conn
         cursor = conn.cursor()
         
         cursor.execute('SELECT id FROM jobs WHERE job_hash = ?', (job_hash,))
         result = cursor.fetchone()
         
-        conn.close()
-        
         return result is not None
     
+    def known_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Find which of the given job hashes are already stored.
+        
+        Args:
+            hashes: Job hashes from _generate_job_hash
+            
+        Returns:
+            The subset of hashes present in the jobs table
+        """
+        cursor = self._ro_conn.execute(
+            'SELECT job_hash FROM jobs WHERE job_hash IN (SELECT value FROM json_each(?))',
+            (json.dumps(hashes),)
+        )
+        return {row[0] for row in cursor}
+    
     def add_job(self, job: Dict) -> Optional[int]:
         """
         Add job to database if not duplicate.
@@ -108,47 +280,187 @@ class JobDatabase:
         Returns:
             Job ID if added, None if duplicate
         """
-        if self.is_duplicate(job):
-            return None
-        
         job_hash = self._generate_job_hash(job)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cursor = conn.cursor()
         
-        try:
-            cursor.execute('''
-                INSERT INTO jobs (
-                    job_hash, title, company, location, category, source, url,
-                    description, posted_date, discovered_date, sponsor_confidence,
-                    entry_level_reasoning, score
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_hash,
-                job.get('title', ''),
-                job.get('company', ''),
-                job.get('location', ''),
-                job.get('category', ''),
-                job.get('source', ''),
-                job.get('url', ''),
-                job.get('description', ''),
-                job.get('posted_date', ''),
-                datetime.now().isoformat(),
-                job.get('sponsor_confidence', ''),
-                job.get('entry_level_reasoning', ''),
-                job.get('score', 0.0)
-            ))
+        cursor.execute(_INSERT_JOB_SQL, self._job_row(job_hash, job, datetime.now().isoformat()))
+        conn.commit()
+        
+        if cursor.rowcount == 0:
+            return None
+        
+        return cursor.lastrowid
+    
+    def add_jobs_bulk(self, jobs: List[Dict]) -> List[Optional[int]]:
+        """
+        Add a batch of jobs in a single transaction.
+        
+        Duplicates (already stored, or repeated within the batch) are
+        dropped before the insert; INSERT OR IGNORE against the UNIQUE
+        job_hash column still guards against races.
+        
+        Args:
+            jobs: List of job dictionaries
             
-            job_id = cursor.lastrowid
-            conn.commit()
+        Returns:
+            List aligned with jobs: job ID if added, None if duplicate
+        """
+        if not jobs:
+            return []
+        
+        hashes = [self._generate_job_hash(job) for job in jobs]
+        discovered_date = datetime.now().isoformat()
+        
+        conn = self._conn
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            existing = {
+                row[0] for row in conn.execute(
+                    'SELECT job_hash FROM jobs WHERE job_hash IN (SELECT value FROM json_each(?))',
+                    (json.dumps(list(dict.fromkeys(hashes))),)
+                )
+            }
             
-            return job_id
+            # Build and insert rows only for new jobs (first occurrence wins)
+            fresh = {}
+            for h, job in zip(hashes, jobs):
+                if h not in existing and h not in fresh:
+                    fresh[h] = self._job_row(h, job, discovered_date)
+            
+            new_ids = {}
+            if fresh:
+                conn.executemany(_INSERT_JOB_SQL, fresh.values())
+                new_ids = {
+                    job_hash: job_id for job_id, job_hash in conn.execute(
+                        'SELECT id, job_hash FROM jobs WHERE job_hash IN (SELECT value FROM json_each(?))',
+                        (json.dumps(list(fresh)),)
+                    )
+                }
+        
+        # Only the first occurrence of each new hash gets the ID
+        return [new_ids.pop(h, None) for h in hashes]
+    
+    def insert_jobs(self, jobs: List[Dict]) -> int:
+        """
+        Insert a batch of jobs in a single transaction, skipping duplicates.
+        
+        Cheaper than add_jobs_bulk when the caller only needs the count.
+        
+        Args:
+            jobs: List of job dictionaries
+            
+        Returns:
+            Number of new jobs inserted
+        """
+        if not jobs:
+            return 0
+        
+        discovered_date = datetime.now().isoformat()
+        rows = [self._job_row(self._generate_job_hash(job), job, discovered_date) for job in jobs]
+        
+        conn = self._conn
+        before = conn.total_changes
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(_INSERT_JOB_SQL, rows)
+        
+        return conn.total_changes - before
+    
+    def _job_row(self, job_hash: str, job: Dict, discovered_date: str) -> tuple:
+        """Build the INSERT parameter tuple for a job."""
+        return (
+            job_hash,
+            job.get('title', ''),
+            job.get('company', ''),
+            job.get('location', ''),
+            job.get('category', ''),
+            job.get('source', ''),
+            job.get('url', ''),
+            job.get('description') or job.get('description_summary', ''),
+            job.get('posted_date', ''),
+            discovered_date,
+            job.get('sponsor_confidence', ''),
+            job.get('entry_level_reasoning', ''),
+            job.get('score', 0.0)
+        )
+    
+    def get_classification(self, job_hash: str) -> Optional[Tuple[str, bool, str]]:
+        """
+        Look up a cached classification.
+        
+        Args:
+            job_hash: Job hash from _generate_job_hash
             
-        except sqlite3.IntegrityError:
-            # Duplicate hash
+        Returns:
+            Tuple of (category, is_entry_level, reasoning), or None on miss
+        """
+        cursor = self._ro_conn.cursor()
+        cursor.execute(
+            'SELECT category, is_entry_level, reasoning FROM classifications WHERE job_hash = ?',
+            (job_hash,)
+        )
+        row = cursor.fetchone()
+        
+        if row is None:
             return None
-        finally:
-            conn.close()
+        
+        return row[0], bool(row[1]), row[2]
+    
+    def put_classification(self, job_hash: str, category: str, is_entry_level: bool, reasoning: str):
+        """
+        Store a classification result in the cache.
+        
+        Args:
+            job_hash: Job hash from _generate_job_hash
+            category: Job category
+            is_entry_level: Whether the job is entry-level
+            reasoning: Classification reasoning
+        """
+        conn = self._conn
+        conn.execute('''
+            INSERT OR REPLACE INTO classifications (job_hash, category, is_entry_level, reasoning)
+            VALUES (?, ?, ?, ?)
+        ''', (job_hash, category, int(is_entry_level), reasoning))
+        conn.commit()
+    
+    def get_sponsor_signal(self, job_hash: str, max_age: Optional[float] = None) -> Optional[Tuple[str, str]]:
+        """
+        Look up a cached sponsorship text signal.
+        
+        Args:
+            job_hash: Cache key (job hash plus description hash, see
+                SponsorshipAnalyzer._sponsor_cache_key)
+            max_age: Ignore entries older than this many seconds
+            
+        Returns:
+            Tuple of (signal, reasoning), or None on miss
+        """
+        min_ts = datetime.now().timestamp() - max_age if max_age is not None else 0
+        
+        cursor = self._ro_conn.cursor()
+        cursor.execute(
+            'SELECT signal, reasoning FROM sponsor_cache WHERE job_hash = ? AND ts >= ?',
+            (job_hash, min_ts)
+        )
+        return cursor.fetchone()
+    
+    def put_sponsor_signals(self, signals: Dict[str, Tuple[str, str]]):
+        """
+        Store sponsorship text signals in the cache in one transaction.
+        
+        Args:
+            signals: Mapping of cache key to (signal, reasoning)
+        """
+        ts = int(datetime.now().timestamp())
+        
+        conn = self._conn
+        conn.executemany('''
+            INSERT OR REPLACE INTO sponsor_cache (job_hash, signal, reasoning, ts)
+            VALUES (?, ?, ?, ?)
+        ''', [(job_hash, signal, reasoning, ts) for job_hash, (signal, reasoning) in signals.items()])
+        conn.commit()
     
     def get_unsent_jobs(self) -> List[Dict]:
         """
@@ -157,9 +469,8 @@ class JobDatabase:
         Returns:
             List of job dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._ro_conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute('''
             SELECT * FROM jobs 
@@ -168,7 +479,6 @@ class JobDatabase:
         ''')
         
         rows = cursor.fetchall()
-        conn.close()
         
         jobs = []
         for row in rows:
@@ -177,6 +487,29 @@ class JobDatabase:
         
         return jobs
     
+    def get_top_unsent(self, limit: int) -> Iterator[Dict]:
+        """
+        Yield the highest-scored unsent jobs, limited in SQL.
+        
+        Args:
+            limit: Maximum number of jobs to return
+            
+        Yields:
+            Job dictionaries in descending score order
+        """
+        cursor = self._ro_conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        cursor.execute('''
+            SELECT * FROM jobs 
+            WHERE sent_in_digest = 0 
+            ORDER BY score DESC
+            LIMIT ?
+        ''', (limit,))
+        
+        for row in cursor:
+            yield dict(row)
+    
     def mark_as_sent(self, job_ids: List[int]):
         """
         Mark jobs as sent in digest.
@@ -187,18 +520,17 @@ class JobDatabase:
         if not job_ids:
             return
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cursor = conn.cursor()
         
-        placeholders = ','.join('?' * len(job_ids))
-        cursor.execute(f'''
+        # Static SQL over a JSON array: one cached statement for any batch size
+        cursor.execute('''
             UPDATE jobs 
             SET sent_in_digest = 1, sent_date = ? 
-            WHERE id IN ({placeholders})
-        ''', [datetime.now().isoformat()] + job_ids)
+            WHERE id IN (SELECT value FROM json_each(?))
+        ''', (datetime.now().isoformat(), json.dumps(job_ids)))
         
         conn.commit()
-        conn.close()
     
     def cleanup_old_jobs(self, days: int = 30):
         """
@@ -209,40 +541,33 @@ class JobDatabase:
         """
         cutoff_date = datetime.now() - timedelta(days=days)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._conn
         
-        cursor.execute('''
-            DELETE FROM jobs 
-            WHERE discovered_date < ?
-        ''', (cutoff_date.isoformat(),))
+        with conn:
+            cursor = conn.execute('''
+                DELETE FROM jobs 
+                WHERE discovered_date < ?
+            ''', (cutoff_date.isoformat(),))
+            deleted_count = cursor.rowcount
         
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        # Fold the WAL back into the main file and truncate it
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
         
         print(f"Cleaned up {deleted_count} old jobs")
     
     def get_stats(self) -> Dict:
         """Get database statistics."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._ro_conn
         cursor = conn.cursor()
         
-        cursor.execute('SELECT COUNT(*) FROM jobs')
-        total_jobs = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE sent_in_digest = 1')
-        sent_jobs = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE sent_in_digest = 0')
-        unsent_jobs = cursor.fetchone()[0]
-        
-        conn.close()
+        # One scan for all counts
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(sent_in_digest), 0) FROM jobs')
+        total_jobs, sent_jobs = cursor.fetchone()
         
         return {
             'total_jobs': total_jobs,
             'sent_jobs': sent_jobs,
-            'unsent_jobs': unsent_jobs
+            'unsent_jobs': total_jobs - sent_jobs
         }
 
 
@@ -263,15 +588,43 @@ class Deduplicator:
             List of non-duplicate jobs
         """
         new_jobs = []
+        job_ids = self.db.add_jobs_bulk(jobs)
         
-        for job in jobs:
-            job_id = self.db.add_job(job)
+        for job, job_id in zip(jobs, job_ids):
             if job_id is not None:
                 job['db_id'] = job_id
                 new_jobs.append(job)
         
         return new_jobs
     
+    def filter_known(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Drop jobs that are already stored, without writing anything.
+        
+        Run before classification so stored postings don't cost LLM calls.
+        
+        Args:
+            jobs: List of job dictionaries
+            
+        Returns:
+            Jobs not yet in the database, in input order
+        """
+        hashes = [self.db._generate_job_hash(job) for job in jobs]
+        known = self.db.known_hashes(hashes)
+        return [job for job, job_hash in zip(jobs, hashes) if job_hash not in known]
+    
+    def bulk_upsert(self, jobs: List[Dict]) -> int:
+        """
+        Store a batch of jobs, skipping duplicates.
+        
+        Args:
+            jobs: List of job dictionaries
+            
+        Returns:
+            Number of new jobs added to the database
+        """
+        return self.db.insert_jobs(jobs)
+    
     def get_jobs_for_digest(self, max_count: int = 12) -> List[Dict]:
         """
         Get top jobs for daily digest.
@@ -282,8 +635,7 @@ class Deduplicator:
         Returns:
             List of top-scored unsent jobs
         """
-        unsent_jobs = self.db.get_unsent_jobs()
-        return unsent_jobs[:max_count]
+        return list(self.db.get_top_unsent(max_count))
     
     def mark_digest_sent(self, jobs: List[Dict]):
         """Mark jobs as sent in digest."""
@@ -293,8 +645,6 @@ class Deduplicator:
 
 if __name__ == '__main__':
     # Test the deduplicator
-    from datetime import timedelta
-    
     dedup = Deduplicator('test_jobs.db')
     
     test_jobs = [
@@ -329,3 +679,5 @@ if __name__ == '__main__':
     
     stats = dedup.db.get_stats()
     print(f"Database stats: {stats}")
+    
+    dedup.db.close()
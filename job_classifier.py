@@ -4,17 +4,60 @@ Job Classification Module
 Classifies jobs into categories and validates entry-level criteria using LLM.
 """
 
-from openai import OpenAI
-from typing import Dict, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import json
 import re
 
+from deduplicator import JobDatabase
+
+CLASSIFICATION_FAILED = 'Classification failed'
+
+# Title keyword patterns for quick rule-based classification
+_DS_RE = re.compile(r'data scientist|ml engineer|machine learning', re.IGNORECASE)
+_DA_RE = re.compile(r'data analyst|business analyst|analytics', re.IGNORECASE)
+_QUANT_RE = re.compile(r'quant|quantitative|financial engineer|trading|risk analyst', re.IGNORECASE)
+_DE_RE = re.compile(r'data engineer|etl|data pipeline', re.IGNORECASE)
+
+# Title terms for entry-level validation
+_ENTRY_RE = re.compile(r'new grad|entry level|junior|\bi\b|associate|early career', re.IGNORECASE)
+_SENIOR_RE = re.compile(r'senior|staff|principal|\blead\b|manager|director', re.IGNORECASE)
+
+# Experience requirement, e.g. "3+ years of experience"
+_EXP_RE = re.compile(r'(\d+)\+?\s*years?\s*(?:of)?\s*experience', re.IGNORECASE)
+
+
+def _load_json_object(text: str) -> Optional[Dict]:
+    """
+    Parse the JSON object in an LLM response.
+    
+    Responses are usually bare JSON; otherwise the object is trimmed out
+    from the first '{' to the last '}'. Returns None if there is none.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        lo, hi = text.find('{'), text.rfind('}')
+        if lo == -1 or hi < lo:
+            return None
+        return json.loads(text[lo:hi + 1])
+
 
 class JobClassifier:
     """Classifies jobs and validates entry-level fit."""
     
-    def __init__(self):
+    def __init__(self, db: Optional[JobDatabase] = None):
+        """
+        Initialize the classifier.
+        
+        Args:
+            db: Optional job database used to cache LLM classifications
+        """
         self.client = OpenAI()
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.db = db
         self.categories = [
             'Data Scientist',
             'Data Analyst',
@@ -23,6 +66,20 @@ class JobClassifier:
             'Other'
         ]
     
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        AsyncOpenAI client for the running event loop.
+        
+        An async client's connections belong to the loop that opened them,
+        and every asyncio.run() starts a new loop, so a client is made per loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = AsyncOpenAI()
+            self._async_loop = loop
+        return self._async_client
+    
     def classify_job(self, job: Dict) -> Tuple[str, bool, str]:
         """
         Classify a job into a category and validate entry-level fit.
@@ -41,37 +98,115 @@ class JobClassifier:
         
         # If uncertain or need validation, use LLM
         if category == 'Other' or not description:
-            category, is_entry_level, reasoning = self._llm_classify(job)
+            category, is_entry_level, reasoning = self._cached_llm_classify(job)
+        else:
+            is_entry_level, reasoning = self._validate_entry_level(job)
+        
+        return category, is_entry_level, reasoning
+    
+    async def classify_job_async(self, job: Dict) -> Tuple[str, bool, str]:
+        """
+        Async variant of classify_job; only the LLM call is awaited.
+        
+        Args:
+            job: Job dictionary with title, company, location, description
+            
+        Returns:
+            Tuple of (category, is_entry_level, reasoning)
+        """
+        title = job.get('title', '')
+        description = job.get('description', '')
+        
+        category = self._quick_classify(title)
+        
+        if category == 'Other' or not description:
+            category, is_entry_level, reasoning = await self._cached_llm_classify_async(job)
         else:
             is_entry_level, reasoning = self._validate_entry_level(job)
         
         return category, is_entry_level, reasoning
     
+    async def classify_jobs(self, jobs: List[Dict], concurrency: int = 10) -> List[Tuple[str, bool, str]]:
+        """
+        Classify many jobs concurrently.
+        
+        Usage: results = asyncio.run(classifier.classify_jobs(jobs))
+        
+        Args:
+            jobs: List of job dictionaries
+            concurrency: Maximum number of in-flight LLM requests
+            
+        Returns:
+            List of (category, is_entry_level, reasoning) aligned with jobs
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(job: Dict) -> Tuple[str, bool, str]:
+            async with semaphore:
+                return await self.classify_job_async(job)
+        
+        return await asyncio.gather(*(bounded(job) for job in jobs))
+    
     def _quick_classify(self, title: str) -> str:
         """Quick rule-based classification from job title."""
-        title_lower = title.lower()
-        
         # Data Scientist patterns
-        if any(keyword in title_lower for keyword in ['data scientist', 'ml engineer', 'machine learning']):
+        if _DS_RE.search(title):
             return 'Data Scientist'
         
         # Data Analyst patterns
-        if any(keyword in title_lower for keyword in ['data analyst', 'business analyst', 'analytics']):
+        if _DA_RE.search(title):
             return 'Data Analyst'
         
         # Quantitative Finance patterns
-        quant_keywords = ['quant', 'quantitative', 'financial engineer', 'trading', 'risk analyst']
-        if any(keyword in title_lower for keyword in quant_keywords):
+        if _QUANT_RE.search(title):
             return 'Quantitative Finance'
         
         # Data Engineer patterns
-        if any(keyword in title_lower for keyword in ['data engineer', 'etl', 'data pipeline']):
+        if _DE_RE.search(title):
             return 'Data Engineer'
         
         return 'Other'
     
-    def _llm_classify(self, job: Dict) -> Tuple[str, bool, str]:
-        """Use LLM to classify job and validate entry-level fit."""
+    def _cached_llm_classify(self, job: Dict) -> Tuple[str, bool, str]:
+        """Classify with the LLM, reusing cached results for the same job hash."""
+        if self.db is None:
+            return self._llm_classify(job)
+        
+        job_hash = self.db._generate_job_hash(job)
+        cached = self.db.get_classification(job_hash)
+        if cached is not None:
+            return cached
+        
+        result = self._llm_classify(job)
+        self._store_classification(job_hash, result)
+        
+        return result
+    
+    async def _cached_llm_classify_async(self, job: Dict) -> Tuple[str, bool, str]:
+        """Async variant of _cached_llm_classify; cache reads and writes run in a worker thread."""
+        if self.db is None:
+            return await self._llm_classify_async(job)
+        
+        job_hash = self.db._generate_job_hash(job)
+        cached = await asyncio.to_thread(self.db.get_classification, job_hash)
+        if cached is not None:
+            return cached
+        
+        result = await self._llm_classify_async(job)
+        await asyncio.to_thread(self._store_classification, job_hash, result)
+        
+        return result
+    
+    def _store_classification(self, job_hash: str, result: Tuple[str, bool, str]):
+        """Cache a classification unless it is a fallback from a failed call."""
+        category, is_entry_level, reasoning = result
+        
+        # Don't cache fallbacks so failed calls are retried next time
+        if reasoning != CLASSIFICATION_FAILED:
+            self.db.put_classification(job_hash, category, is_entry_level, reasoning)
+    
+    def _build_llm_request(self, job: Dict) -> Dict:
+        """Build chat completion arguments for classifying a job."""
         title = job.get('title', '')
         company = job.get('company', '')
         description = job.get('description', '')[:2000]  # Limit description length
@@ -100,55 +235,68 @@ Respond in JSON format:
   "reasoning": "..."
 }}"""
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are a job classification expert specializing in data and quantitative finance roles."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=300
-            )
+        return {
+            'model': "gpt-4.1-mini",
+            'messages': [
+                {"role": "system", "content": "You are a job classification expert specializing in data and quantitative finance roles."},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': 300
+        }
+    
+    def _parse_llm_response(self, response, job: Dict) -> Tuple[str, bool, str]:
+        """Extract the classification from an LLM response, with rule-based fallback."""
+        result_text = response.choices[0].message.content.strip()
+        
+        # Extract JSON from response
+        result = _load_json_object(result_text)
+        if isinstance(result, dict):
+            category = result.get('category', 'Other')
+            is_entry_level = result.get('is_entry_level', False)
+            reasoning = result.get('reasoning', '')
             
-            result_text = response.choices[0].message.content.strip()
+            return category, is_entry_level, reasoning
+        
+        return self._quick_classify(job.get('title', '')), False, CLASSIFICATION_FAILED
+    
+    def _llm_classify(self, job: Dict) -> Tuple[str, bool, str]:
+        """Use LLM to classify job and validate entry-level fit."""
+        try:
+            response = self.client.chat.completions.create(**self._build_llm_request(job))
+            return self._parse_llm_response(response, job)
             
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                category = result.get('category', 'Other')
-                is_entry_level = result.get('is_entry_level', False)
-                reasoning = result.get('reasoning', '')
-                
-                return category, is_entry_level, reasoning
+        except Exception as e:
+            print(f"Error in LLM classification: {e}")
+        
+        # Fallback to quick classification
+        return self._quick_classify(job.get('title', '')), False, CLASSIFICATION_FAILED
+    
+    async def _llm_classify_async(self, job: Dict) -> Tuple[str, bool, str]:
+        """Async variant of _llm_classify using the AsyncOpenAI client."""
+        try:
+            response = await self.async_client.chat.completions.create(**self._build_llm_request(job))
+            return self._parse_llm_response(response, job)
             
         except Exception as e:
             print(f"Error in LLM classification: {e}")
         
         # Fallback to quick classification
-        return self._quick_classify(job.get('title', '')), False, 'Classification failed'
+        return self._quick_classify(job.get('title', '')), False, CLASSIFICATION_FAILED
     
     def _validate_entry_level(self, job: Dict) -> Tuple[bool, str]:
         """Validate if job meets entry-level criteria."""
-        title = job.get('title', '').lower()
-        description = job.get('description', '').lower()
+        title = job.get('title', '')
+        description = job.get('description', '')
         
         # Check title for entry-level indicators
-        entry_indicators = ['new grad', 'entry level', 'junior', ' i ', 'associate', 'early career']
-        title_match = any(indicator in title for indicator in entry_indicators)
-        
-        # Check for experience requirements
-        exp_pattern = r'(\d+)\+?\s*years?\s*(of)?\s*experience'
-        exp_matches = re.findall(exp_pattern, description)
+        title_match = _ENTRY_RE.search(title) is not None
         
-        max_exp = 0
-        if exp_matches:
-            max_exp = max(int(match[0]) for match in exp_matches)
+        # Check for experience requirements (largest stated requirement wins)
+        max_exp = max(map(int, _EXP_RE.findall(description)), default=0)
         
         # Check for exclusionary senior terms
-        senior_terms = ['senior', 'staff', 'principal', 'lead', 'manager', 'director']
-        has_senior_term = any(term in title for term in senior_terms)
+        has_senior_term = _SENIOR_RE.search(title) is not None
         
         # Determine if entry-level
         is_entry_level = (title_match or max_exp <= 2) and not has_senior_term
@@ -5,12 +5,89 @@ Discovers job postings using JSearch API (RapidAPI).
 Focuses on entry-level data science, analytics, and quant finance roles.
 """
 
+import asyncio
+import hashlib
+import re
+import sqlite3
+import time
+import aiohttp
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import List, Dict, Optional
 from dateutil import parser as date_parser
 
+SEARCH_URL = "https://jsearch.p.rapidapi.com/search"
+
+# Retry policy for rate-limited (HTTP 429) searches
+MAX_ATTEMPTS = 3
+MAX_RETRY_DELAY = 30
+
+# Location substrings that mark a posting as outside the US
+NON_US_INDICATORS = ['canada', 'uk', 'united kingdom', 'india', 'germany',
+                     'france', 'australia', 'singapore', 'china', 'japan']
+
+_NON_US_RE = re.compile('|'.join(map(re.escape, NON_US_INDICATORS)), re.IGNORECASE)
+
+# Freshness window (extended to 3 days for more results)
+FRESHNESS_HOURS = 72
+
+# Raw search responses are reused for this long (seconds)
+CACHE_TTL = 6 * 3600
+
+
+def _parse_datetime(value: str) -> datetime:
+    """Parse a posted-date string, using the fast ISO-8601 path when possible."""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return date_parser.parse(value)
+
+
+class ResponseCache:
+    """Small SQLite-backed TTL cache for raw JSearch response bodies."""
+
+    def __init__(self, db_path, ttl: float = CACHE_TTL):
+        self.db_path = str(db_path)
+        self.ttl = ttl
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+        conn.commit()
+        conn.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached body for key, or None if missing or expired."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            'SELECT body FROM responses WHERE cache_key = ? AND expires_at >= ?',
+            (key, time.time())
+        ).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def set(self, key: str, body: bytes):
+        """Store a response body under key until the TTL expires."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            'INSERT OR REPLACE INTO responses (cache_key, body, expires_at) VALUES (?, ?, ?)',
+            (key, body, time.time() + self.ttl)
+        )
+        conn.commit()
+        conn.close()
+
 
 class JobDiscovery:
     """Discovers and extracts job postings using JSearch API."""
@@ -22,6 +99,26 @@ class JobDiscovery:
             'X-RapidAPI-Key': self.api_key,
             'X-RapidAPI-Host': self.api_host
         }
+        # Keep-alive session for the sync search path, so repeated queries
+        # reuse one TLS connection and transient errors are retried; 429s
+        # are retried in _search_jobs so Retry-After waits stay capped
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[502, 503, 504],
+                respect_retry_after_header=False,
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        # Reuse identical searches within CACHE_TTL to save API quota;
+        # opened on first search (see cache)
+        self._cache: Optional[ResponseCache] = None
         # Search queries for target job types (6 queries to fit 200 requests/month)
         self.search_queries = [
             'entry level data scientist',
@@ -38,11 +135,29 @@ class JobDiscovery:
             'careerbuilder', 'snagajob', 'upward.net', 'lensa',
             'bebee', 'jobget', 'climatebase'
         ]
+        self._cutoff = None  # Freshness cutoff, set per discovery cycle
+        self._blocked_re = re.compile('|'.join(map(re.escape, self.blocked_employers)), re.IGNORECASE)
+
+    @property
+    def cache(self) -> ResponseCache:
+        """
+        JSearch response cache, opened on first use.
+
+        Lives at JOB_MONITOR_CACHE_PATH (default .jsearch_cache.db next to
+        this file), so constructing JobDiscovery creates no files.
+        """
+        if self._cache is None:
+            default_path = Path(__file__).parent / '.jsearch_cache.db'
+            self._cache = ResponseCache(os.getenv('JOB_MONITOR_CACHE_PATH', str(default_path)))
+        return self._cache
 
     def discover_jobs(self) -> List[Dict]:
         """
         Main discovery method that fetches jobs from JSearch API.
 
+        All search queries are issued concurrently, so the step takes
+        roughly one round trip instead of one per query.
+
         Returns:
             List of job dictionaries with metadata
         """
@@ -50,33 +165,162 @@ class JobDiscovery:
             print("  [ERROR] RapidAPI key not configured. Please add your key to config.env")
             return []
 
+        # Fix the freshness cutoff once for this discovery cycle
+        self._cutoff = datetime.now(timezone.utc) - timedelta(hours=FRESHNESS_HOURS)
+
+        for query in self.search_queries:
+            print(f"  Searching: {query}")
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            results = asyncio.run(self._search_all_async())
+        else:
+            # Already inside an event loop, where asyncio.run() can't be used
+            results = [self._search_jobs(query) for query in self.search_queries]
+
         all_jobs = []
         seen_ids = set()  # Avoid duplicates across queries
         filtered_count = 0
 
-        for query in self.search_queries:
-            print(f"  Searching: {query}")
-            jobs = self._search_jobs(query)
+        for query, jobs in zip(self.search_queries, results):
+            if isinstance(jobs, BaseException):
+                print(f"    [ERROR] Failed to fetch jobs for '{query}': {jobs}")
+                continue
 
-            for job in jobs:
-                job_id = job.get('job_id', '')
+            # Dedupe and filter on the raw records so each posting is
+            # parsed at most once, however many queries returned it
+            for raw_job in jobs:
+                job_id = raw_job.get('job_id', '')
                 if job_id and job_id not in seen_ids:
                     seen_ids.add(job_id)
                     # Filter out job aggregators
-                    if self._is_blocked_employer(job.get('company', '')):
+                    if self._is_blocked_employer(raw_job.get('employer_name', 'Unknown')):
                         filtered_count += 1
                         continue
-                    all_jobs.append(job)
+                    job = self._parse_job(raw_job)
+                    if job:
+                        all_jobs.append(job)
 
         print(f"  Total unique jobs found: {len(all_jobs)} (filtered out {filtered_count} aggregator listings)")
         return all_jobs
 
     def _is_blocked_employer(self, company: str) -> bool:
         """Check if employer is a job aggregator that should be filtered out."""
-        if not company:
-            return False
-        company_lower = company.lower()
-        return any(blocked in company_lower for blocked in self.blocked_employers)
+        return bool(company and self._blocked_re.search(company))
+
+    def _search_params(self, query: str, num_pages: int) -> Dict[str, str]:
+        """Build JSearch query parameters."""
+        return {
+            'query': f'{query} in United States',
+            'page': '1',
+            'num_pages': str(num_pages),
+            'date_posted': 'week',  # Jobs from past week (more results)
+            'remote_jobs_only': 'false',
+            'employment_types': 'FULLTIME'
+        }
+
+    def _cache_key(self, params: Dict[str, str]) -> str:
+        """Cache key for a search: hash of query, date window and page count."""
+        key_input = f"{params['query']}|{params['date_posted']}|{params['num_pages']}"
+        return hashlib.sha256(key_input.encode()).hexdigest()
+
+    def _parse_results(self, data: Dict) -> List[Dict]:
+        """Extract the raw job records from a JSearch response payload."""
+        return data.get('data') or []
+
+    def _report_status(self, status: int):
+        """Print a diagnostic for a non-200 JSearch response."""
+        if status == 403:
+            print(f"    [ERROR] API access denied. Check your RapidAPI key.")
+        elif status == 429:
+            print(f"    [WARNING] Rate limit reached. Try again later.")
+        else:
+            print(f"    [ERROR] API returned status {status}")
+
+    def _retry_delay(self, headers, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying a rate-limited request.
+
+        Uses Retry-After, then X-RateLimit-Reset, then exponential backoff.
+
+        Returns:
+            Delay in seconds, or None if the limit resets too far out to wait
+        """
+        for header in ('Retry-After', 'X-RateLimit-Reset'):
+            value = headers.get(header)
+            if value is not None:
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                return delay if delay <= MAX_RETRY_DELAY else None
+
+        return float(2 ** attempt)
+
+    async def _search_all_async(self) -> List:
+        """
+        Run every search query concurrently over one HTTP session.
+
+        Returns:
+            List aligned with search_queries: job list or raised exception
+        """
+        # Open the response cache in a worker thread once, before the
+        # queries fan out, so its SQLite setup never runs on the loop
+        await asyncio.to_thread(lambda: self.cache)
+
+        connector = aiohttp.TCPConnector(limit_per_host=len(self.search_queries))
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector) as session:
+            return await asyncio.gather(
+                *(self._search_jobs_async(session, query) for query in self.search_queries),
+                return_exceptions=True
+            )
+
+    async def _search_jobs_async(self, session: 'aiohttp.ClientSession', query: str,
+                                 num_pages: int = 1) -> List[Dict]:
+        """
+        Search for jobs using JSearch API without blocking the event loop.
+
+        Args:
+            session: Shared aiohttp session carrying the API headers
+            query: Search query string
+            num_pages: Number of pages to fetch (default 1 to conserve API calls)
+
+        Returns:
+            List of raw JSearch job records (parsed by discover_jobs)
+        """
+        jobs = []
+        params = self._search_params(query, num_pages)
+        cache_key = self._cache_key(params)
+
+        # SQLite calls block (including the first open of the cache), so
+        # they run off the event loop
+        cached = await asyncio.to_thread(lambda: self.cache.get(cache_key))
+        if cached is not None:
+            return self._parse_results(orjson.loads(cached))
+
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                async with session.get(SEARCH_URL, params=params,
+                                       timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status == 429 and attempt < MAX_ATTEMPTS - 1:
+                        delay = self._retry_delay(response.headers, attempt)
+                        if delay is not None:
+                            await asyncio.sleep(delay)
+                            continue
+
+                    if response.status == 200:
+                        body = await response.read()
+                        jobs = self._parse_results(orjson.loads(body))
+                        await asyncio.to_thread(lambda: self.cache.set(cache_key, body))
+                    else:
+                        self._report_status(response.status)
+                    break
+
+        except Exception as e:
+            print(f"    [ERROR] Failed to fetch jobs: {e}")
+
+        return jobs
 
     def _search_jobs(self, query: str, num_pages: int = 1) -> List[Dict]:
         """
@@ -87,38 +331,32 @@ class JobDiscovery:
             num_pages: Number of pages to fetch (default 1 to conserve API calls)
 
         Returns:
-            List of job dictionaries
+            List of raw JSearch job records (parsed by discover_jobs)
         """
         jobs = []
-        url = "https://jsearch.p.rapidapi.com/search"
+        params = self._search_params(query, num_pages)
+        cache_key = self._cache_key(params)
 
-        params = {
-            'query': f'{query} in United States',
-            'page': '1',
-            'num_pages': str(num_pages),
-            'date_posted': 'week',  # Jobs from past week (more results)
-            'remote_jobs_only': 'false',
-            'employment_types': 'FULLTIME'
-        }
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return self._parse_results(orjson.loads(cached))
 
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-
-            if response.status_code == 200:
-                data = response.json()
-                raw_jobs = data.get('data', [])
+            for attempt in range(MAX_ATTEMPTS):
+                response = self.session.get(SEARCH_URL, params=params, timeout=30)
 
-                for raw_job in raw_jobs:
-                    job = self._parse_job(raw_job)
-                    if job:
-                        jobs.append(job)
+                if response.status_code == 429 and attempt < MAX_ATTEMPTS - 1:
+                    delay = self._retry_delay(response.headers, attempt)
+                    if delay is not None:
+                        time.sleep(delay)
+                        continue
 
-            elif response.status_code == 403:
-                print(f"    [ERROR] API access denied. Check your RapidAPI key.")
-            elif response.status_code == 429:
-                print(f"    [WARNING] Rate limit reached. Try again later.")
-            else:
-                print(f"    [ERROR] API returned status {response.status_code}")
+                if response.status_code == 200:
+                    jobs = self._parse_results(orjson.loads(response.content))
+                    self.cache.set(cache_key, response.content)
+                else:
+                    self._report_status(response.status_code)
+                break
 
         except Exception as e:
             print(f"    [ERROR] Failed to fetch jobs: {e}")
@@ -140,7 +378,7 @@ class JobDiscovery:
             posted_str = raw_job.get('job_posted_at_datetime_utc', '')
             if posted_str:
                 try:
-                    posted_date = date_parser.parse(posted_str)
+                    posted_date = _parse_datetime(posted_str)
                 except:
                     posted_date = datetime.now()
             else:
@@ -161,7 +399,7 @@ class JobDiscovery:
             else:
                 location = country
 
-            return {
+            job = {
                 'job_id': raw_job.get('job_id', ''),
                 'title': raw_job.get('job_title', 'Unknown'),
                 'company': raw_job.get('employer_name', 'Unknown'),
@@ -179,6 +417,13 @@ class JobDiscovery:
                 'job_highlights': raw_job.get('job_highlights', {})
             }
 
+            # Lowercased copies for case-insensitive matching downstream;
+            # JSearch sends null for some missing fields
+            job['_company_lc'] = (job['company'] or '').lower()
+            job['_description_lc'] = (job['description'] or '').lower()
+
+            return job
+
         except Exception as e:
             print(f"    [ERROR] Failed to parse job: {e}")
             return None
@@ -195,64 +440,85 @@ class JobDiscovery:
         """
         return job.get('description', '')
 
-    def is_within_24_hours(self, posted_date) -> bool:
-        """Check if job was posted within last 3 days (72 hours)."""
+    def is_within_24_hours(self, posted_date, cutoff: Optional[datetime] = None) -> bool:
+        """
+        Check if job was posted within last 3 days (72 hours).
+
+        Args:
+            posted_date: Posted datetime or date string
+            cutoff: Timezone-aware cutoff; defaults to the one fixed at the
+                start of discover_jobs, or now minus FRESHNESS_HOURS
+
+        Returns:
+            True if the job is recent enough
+        """
         if not posted_date:
             return True  # Assume recent if no date
 
         if isinstance(posted_date, str):
             try:
-                posted_date = date_parser.parse(posted_date)
+                posted_date = _parse_datetime(posted_date)
             except:
                 return True
 
-        cutoff = datetime.now(posted_date.tzinfo) if posted_date.tzinfo else datetime.now()
-        cutoff = cutoff - timedelta(hours=72)  # Extended to 3 days for more results
+        if cutoff is None:
+            cutoff = self._cutoff or datetime.now(timezone.utc) - timedelta(hours=FRESHNESS_HOURS)
 
-        # Handle timezone-aware vs naive datetime comparison
+        # Handle timezone-aware vs naive datetime comparison (naive is local time)
         if posted_date.tzinfo is None:
-            cutoff = cutoff.replace(tzinfo=None)
+            cutoff = cutoff.astimezone().replace(tzinfo=None)
 
         return posted_date >= cutoff
 
-    def is_us_location(self, location: str) -> bool:
-        """Check if location is in the United States."""
-        if not location:
-            return True  # Assume US if no location (API filtered to US)
+    def filter_us_recent(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Keep jobs that pass both is_us_location and is_within_24_hours.
+
+        Posting times are gathered into one array and compared against the
+        cutoff in a single vectorized pass; useful for large backfills.
 
-        location_lower = location.lower()
+        Args:
+            jobs: List of job dictionaries
 
-        # Check for non-US indicators
-        non_us_indicators = ['canada', 'uk', 'united kingdom', 'india', 'germany',
-                            'france', 'australia', 'singapore', 'china', 'japan']
+        Returns:
+            Matching jobs, in input order
+        """
+        n = len(jobs)
+        if not n:
+            return []
 
-        if any(indicator in location_lower for indicator in non_us_indicators):
-            return False
+        cutoff = self._cutoff or datetime.now(timezone.utc) - timedelta(hours=FRESHNESS_HOURS)
 
-        # Check for US indicators
-        us_indicators = ['united states', 'usa', 'u.s.', 'remote']
+        posted = np.fromiter((self._posted_timestamp(job.get('posted_date')) for job in jobs),
+                             dtype=np.float64, count=n)
+        us = np.fromiter((self.is_us_location(job.get('location', '')) for job in jobs),
+                         dtype=bool, count=n)
+        keep = us & (posted >= cutoff.timestamp())
 
-        # US state abbreviations
-        us_states = ['al', 'ak', 'az', 'ar', 'ca', 'co', 'ct', 'de', 'fl', 'ga',
-                     'hi', 'id', 'il', 'in', 'ia', 'ks', 'ky', 'la', 'me', 'md',
-                     'ma', 'mi', 'mn', 'ms', 'mo', 'mt', 'ne', 'nv', 'nh', 'nj',
-                     'nm', 'ny', 'nc', 'nd', 'oh', 'ok', 'or', 'pa', 'ri', 'sc',
-                     'sd', 'tn', 'tx', 'ut', 'vt', 'va', 'wa', 'wv', 'wi', 'wy', 'dc']
+        return [jobs[i] for i in np.flatnonzero(keep)]
 
-        if any(indicator in location_lower for indicator in us_indicators):
-            return True
+    def _posted_timestamp(self, posted_date) -> float:
+        """POSIX time of a posting (naive is local time); +inf if unknown."""
+        if not posted_date:
+            return np.inf  # Assume recent if no date
 
-        # Check for state codes (as separate words)
-        words = location_lower.replace(',', ' ').split()
-        if any(word in us_states for word in words):
-            return True
+        if isinstance(posted_date, str):
+            try:
+                posted_date = _parse_datetime(posted_date)
+            except:
+                return np.inf
+
+        return posted_date.timestamp()
 
-        return True  # Default to True since API is filtered to US
+    def is_us_location(self, location: str) -> bool:
+        """Check if location is in the United States."""
+        # Anything not clearly non-US counts as US, since the API is
+        # already filtered to US postings
+        return not (location and _NON_US_RE.search(location))
 
 
 if __name__ == '__main__':
     # Test the discovery module
-    from pathlib import Path
     from dotenv import load_dotenv
 
     config_path = Path(__file__).parent / 'config.env'
@@ -4,9 +4,28 @@ Job Scoring Module
 Scores and ranks jobs based on multiple criteria.
 """
 
-from typing import Dict, List
+import heapq
+import re
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+import numpy as np
+
+# Phrases that signal a clear entry-level fit in the classifier's reasoning
+CLARITY_INDICATORS = (
+    'new grad',
+    'entry level',
+    'junior',
+    'recent graduate',
+    '0-2 years',
+    'bs/ms',
+    'phd'
+)
+
+# One pass over the text finds every indicator; the lookahead lets
+# overlapping indicators match at each position, like separate `in` checks
+_CLARITY_RE = re.compile('(?=(' + '|'.join(map(re.escape, CLARITY_INDICATORS)) + '))')
+
 
 class JobScorer:
     """Scores and ranks jobs based on priority, sponsorship, and freshness."""
@@ -27,6 +46,13 @@ class JobScorer:
             'MEDIUM': 25,
             'LOW': 5
         }
+        
+        # Lookup tables for vectorized scoring; the extra last slot (0 points)
+        # catches unknown categories / confidence levels
+        self._role_codes = {name: i for i, name in enumerate(self.role_weights)}
+        self._role_lut = np.array(list(self.role_weights.values()) + [0], dtype=np.float64)
+        self._sponsor_codes = {name: i for i, name in enumerate(self.sponsor_weights)}
+        self._sponsor_lut = np.array(list(self.sponsor_weights.values()) + [0], dtype=np.float64)
     
     def score_job(self, job: Dict) -> float:
         """
@@ -59,23 +85,28 @@ class JobScorer:
         
         return score
     
-    def _calculate_freshness_score(self, posted_date) -> float:
-        """Calculate freshness score based on posting time."""
+    def _hours_ago(self, posted_date, now: datetime) -> Optional[float]:
+        """Hours between posting time and now, or None if unknown."""
         if not posted_date:
-            return 0.0
+            return None
 
         if isinstance(posted_date, str):
             try:
                 posted_date = datetime.fromisoformat(posted_date.replace('Z', '+00:00'))
             except:
-                return 0.0
+                return None
 
         # Handle timezone-aware vs naive datetime
-        now = datetime.now()
         if posted_date.tzinfo is not None:
             posted_date = posted_date.replace(tzinfo=None)
 
-        hours_ago = (now - posted_date).total_seconds() / 3600
+        return (now - posted_date).total_seconds() / 3600
+
+    def _calculate_freshness_score(self, posted_date) -> float:
+        """Calculate freshness score based on posting time."""
+        hours_ago = self._hours_ago(posted_date, datetime.now())
+        if hours_ago is None:
+            return 0.0
 
         # Linear decay: 20 points at 0 hours, 0 points at 24 hours
         if hours_ago <= 24:
@@ -89,22 +120,52 @@ class JobScorer:
             return 0.0
         
         # Simple heuristic: longer, more detailed reasoning = higher clarity
-        clarity_indicators = [
-            'new grad',
-            'entry level',
-            'junior',
-            'recent graduate',
-            '0-2 years',
-            'bs/ms',
-            'phd'
-        ]
-        
-        reasoning_lower = reasoning.lower()
-        matches = sum(1 for indicator in clarity_indicators if indicator in reasoning_lower)
+        matches = len(set(_CLARITY_RE.findall(reasoning.lower())))
         
         # Up to 10 points based on clarity indicators
         return min(10, matches * 3)
     
+    def _score_array(self, jobs: List[Dict]) -> np.ndarray:
+        """
+        Score many jobs at once; same result as score_job per job.
+        
+        Fields are gathered into parallel arrays, then role, sponsor and
+        freshness points are computed with vectorized NumPy operations.
+        
+        Args:
+            jobs: List of job dictionaries
+            
+        Returns:
+            Array of scores aligned with jobs
+        """
+        n = len(jobs)
+        now = datetime.now()
+        unknown_role = len(self._role_lut) - 1
+        unknown_sponsor = len(self._sponsor_lut) - 1
+        
+        roles = np.fromiter(
+            (self._role_codes.get(job.get('category', 'Other'), unknown_role) for job in jobs),
+            dtype=np.intp, count=n
+        )
+        sponsors = np.fromiter(
+            (self._sponsor_codes.get(job.get('sponsor_confidence', 'LOW'), unknown_sponsor) for job in jobs),
+            dtype=np.intp, count=n
+        )
+        hours = np.fromiter(
+            (np.nan if (h := self._hours_ago(job.get('posted_date'), now)) is None else h for job in jobs),
+            dtype=np.float64, count=n
+        )
+        clarity = np.fromiter(
+            (self._calculate_clarity_score(job.get('entry_level_reasoning') or '') for job in jobs),
+            dtype=np.float64, count=n
+        )
+        
+        # Linear decay: 20 points at 0 hours, 0 points at 24 hours; unknown -> 0
+        with np.errstate(invalid='ignore'):
+            freshness = np.where(hours <= 24, np.maximum(0, 20 - hours * 20 / 24), 0.0)
+        
+        return self._role_lut[roles] + self._sponsor_lut[sponsors] + freshness + clarity
+    
     def rank_jobs(self, jobs: List[Dict]) -> List[Dict]:
         """
         Score and rank jobs in descending order.
@@ -115,18 +176,22 @@ class JobScorer:
         Returns:
             Sorted list of jobs with scores
         """
-        # Score each job
-        for job in jobs:
-            job['score'] = self.score_job(job)
+        # Score all jobs in one vectorized pass
+        scores = self._score_array(jobs)
+        for job, score in zip(jobs, scores.tolist()):
+            job['score'] = score
         
-        # Sort by score (descending)
-        ranked_jobs = sorted(jobs, key=lambda x: x.get('score', 0), reverse=True)
+        # Sort by score (descending); stable, so ties keep input order
+        order = np.argsort(-scores, kind='stable')
         
-        return ranked_jobs
+        return [jobs[i] for i in order]
     
     def filter_top_jobs(self, jobs: List[Dict], max_count: int = 12) -> List[Dict]:
         """
-        Filter top N jobs after ranking.
+        Filter top N jobs after scoring.
+        
+        Selects with a bounded heap instead of sorting every job; the result
+        matches rank_jobs(jobs)[:max_count], ties included.
         
         Args:
             jobs: List of job dictionaries
@@ -135,8 +200,12 @@ class JobScorer:
         Returns:
             Top N jobs
         """
-        ranked_jobs = self.rank_jobs(jobs)
-        return ranked_jobs[:max_count]
+        scores = self._score_array(jobs).tolist()
+        for job, score in zip(jobs, scores):
+            job['score'] = score
+        
+        top = heapq.nlargest(max_count, range(len(jobs)), key=scores.__getitem__)
+        return [jobs[i] for i in top]
     
     def should_include(self, job: Dict) -> bool:
         """
@@ -4,11 +4,12 @@ Main Orchestrator
 Coordinates all modules and handles scheduling.
 """
 
-import time
-import schedule
-from datetime import datetime
-from typing import List, Dict
-import traceback
+import asyncio
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Union
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -26,6 +27,19 @@ from job_scorer import JobScorer
 from deduplicator import Deduplicator
 from email_sender import EmailDigest
 
+logger = logging.getLogger(__name__)
+
+SEPARATOR = '=' * 60
+
+# Maximum concurrent LLM requests during classification and sponsorship analysis
+MAX_CONCURRENT_LLM = 8
+
+# Maximum jobs classified per discovery cycle
+MAX_JOBS_PER_CYCLE = 20
+
+# Description characters kept on a job once classification is done
+DESCRIPTION_SUMMARY_CHARS = 500
+
 
 class JobMonitorAgent:
     """Main autonomous job monitoring agent."""
@@ -40,11 +54,11 @@ class JobMonitorAgent:
         self.config = config
         
         # Initialize modules
+        self.deduplicator = Deduplicator(config.get('db_path', 'jobs.db'))
         self.discovery = JobDiscovery()
-        self.classifier = JobClassifier()
-        self.sponsor_analyzer = SponsorshipAnalyzer()
+        self.classifier = JobClassifier(self.deduplicator.db)
+        self.sponsor_analyzer = SponsorshipAnalyzer(self.deduplicator.db)
         self.scorer = JobScorer()
-        self.deduplicator = Deduplicator(config.get('db_path', 'jobs.db'))
         
         # Initialize email sender
         self.email_sender = EmailDigest(
@@ -56,7 +70,7 @@ class JobMonitorAgent:
         
         self.recipient_email = config.get('recipient_email', '')
         
-        print("Job Monitor Agent initialized")
+        logger.info("Job Monitor Agent initialized")
     
     def run_discovery_cycle(self):
         """
@@ -69,126 +83,145 @@ class JobMonitorAgent:
         4. Scores and deduplicates
         5. Stores in database
         """
-        print(f"\n{'='*60}")
-        print(f"Starting discovery cycle at {datetime.now()}")
-        print(f"{'='*60}\n")
+        logger.info("\n%s", SEPARATOR)
+        logger.info("Starting discovery cycle at %s", datetime.now())
+        logger.info("%s\n", SEPARATOR)
         
         try:
             # Step 1: Discover jobs
-            print("Step 1: Discovering jobs from sources...")
+            logger.info("Step 1: Discovering jobs from sources...")
             raw_jobs = self.discovery.discover_jobs()
-            print(f"  → Found {len(raw_jobs)} raw job postings")
+            logger.info("  → Found %s raw job postings", len(raw_jobs))
             
             if not raw_jobs:
-                print("  → No jobs discovered, ending cycle")
+                logger.info("  → No jobs discovered, ending cycle")
                 return
             
-            # Step 2: Filter for US locations and 24-hour freshness
-            print("\nStep 2: Filtering for US locations and freshness...")
-            us_jobs = [
-                job for job in raw_jobs 
-                if self.discovery.is_us_location(job.get('location', ''))
-                and self.discovery.is_within_24_hours(job.get('posted_date'))
-            ]
-            print(f"  → {len(us_jobs)} jobs meet location and freshness criteria")
+            # Step 2: Filter for US locations and 24-hour freshness, then cap
+            # the cycle's LLM work
+            logger.info("\nStep 2: Filtering for US locations and freshness...")
+            matching_jobs = self.discovery.filter_us_recent(raw_jobs)
+            us_jobs = matching_jobs[:MAX_JOBS_PER_CYCLE]  # Limit to avoid rate limits
+            logger.info("  → %s jobs meet location and freshness criteria (processing %s)",
+                        len(matching_jobs), len(us_jobs))
             
             if not us_jobs:
-                print("  → No jobs passed filters, ending cycle")
-                return
-            
-            # Step 3: Fetch full descriptions and classify
-            print("\nStep 3: Classifying jobs and validating entry-level fit...")
-            classified_jobs = []
-            
-            for i, job in enumerate(us_jobs[:20], 1):  # Limit to avoid rate limits
-                print(f"  Processing job {i}/{min(len(us_jobs), 20)}: {job.get('title')}")
-                
-                # Fetch full description if needed
-                if not job.get('description'):
-                    job['description'] = self.discovery.fetch_job_description(job)
-                
-                # Classify and validate
-                category, is_entry_level, reasoning = self.classifier.classify_job(job)
-                
-                job['category'] = category
-                job['is_entry_level'] = is_entry_level
-                job['entry_level_reasoning'] = reasoning
-                
-                # Discard if not relevant
-                if not self.classifier.should_discard(category, is_entry_level):
-                    classified_jobs.append(job)
-                    print(f"    ✓ {category} | Entry-level: {is_entry_level}")
-                else:
-                    print(f"    ✗ Discarded: {category} | Entry-level: {is_entry_level}")
-            
-            print(f"  → {len(classified_jobs)} jobs classified as relevant")
-            
-            if not classified_jobs:
-                print("  → No relevant jobs found, ending cycle")
+                logger.info("  → No jobs passed filters, ending cycle")
                 return
             
-            # Step 4: Analyze H-1B sponsorship
-            print("\nStep 4: Analyzing H-1B sponsorship likelihood...")
-            sponsored_jobs = []
-            
-            for job in classified_jobs:
-                confidence, reasoning = self.sponsor_analyzer.analyze_sponsorship(job)
-                
-                job['sponsor_confidence'] = confidence
-                job['sponsor_reasoning'] = reasoning
-                
-                # Discard excluded or low-confidence jobs
-                if confidence != 'EXCLUDED' and not self.sponsor_analyzer.should_discard(confidence):
-                    sponsored_jobs.append(job)
-                    print(f"  ✓ {job.get('company')}: {confidence}")
-                else:
-                    print(f"  ✗ {job.get('company')}: {confidence}")
-            
-            print(f"  → {len(sponsored_jobs)} jobs have acceptable sponsorship likelihood")
+            # Steps 3-4: Classify, validate entry-level fit and analyze
+            # sponsorship; each job runs through both stages in one task
+            logger.info("\nSteps 3-4: Classifying jobs and analyzing H-1B sponsorship likelihood...")
+            sponsored_jobs = asyncio.run(self._process_jobs(us_jobs))
+            logger.info("  → %s relevant jobs have acceptable sponsorship likelihood", len(sponsored_jobs))
             
             if not sponsored_jobs:
-                print("  → No jobs with sponsorship potential, ending cycle")
+                logger.info("  → No relevant jobs with sponsorship potential, ending cycle")
                 return
             
             # Step 5: Score and rank jobs
-            print("\nStep 5: Scoring and ranking jobs...")
+            logger.info("\nStep 5: Scoring and ranking jobs...")
             scored_jobs = self.scorer.rank_jobs(sponsored_jobs)
             
             for i, job in enumerate(scored_jobs[:5], 1):
-                print(f"  {i}. {job.get('title')} at {job.get('company')} - Score: {job.get('score', 0):.2f}")
+                logger.info("  %s. %s at %s - Score: %.2f", i, job.get('title'), job.get('company'), job.get('score', 0))
             
             # Step 6: Deduplicate and store
-            print("\nStep 6: Deduplicating and storing in database...")
-            new_jobs = self.deduplicator.filter_duplicates(scored_jobs)
-            print(f"  → {len(new_jobs)} new jobs added to database")
+            logger.info("\nStep 6: Deduplicating and storing in database...")
+            new_count = self.deduplicator.bulk_upsert(scored_jobs)
+            logger.info("  → %s new jobs added to database", new_count)
             
             # Print statistics
             stats = self.deduplicator.db.get_stats()
-            print(f"\nDatabase Statistics:")
-            print(f"  Total jobs: {stats['total_jobs']}")
-            print(f"  Unsent jobs: {stats['unsent_jobs']}")
-            print(f"  Sent jobs: {stats['sent_jobs']}")
+            logger.info("\nDatabase Statistics:")
+            logger.info("  Total jobs: %s", stats['total_jobs'])
+            logger.info("  Unsent jobs: %s", stats['unsent_jobs'])
+            logger.info("  Sent jobs: %s", stats['sent_jobs'])
             
         except Exception as e:
-            print(f"\n❌ Error in discovery cycle: {e}")
-            traceback.print_exc()
+            logger.exception("\n❌ Error in discovery cycle: %s", e)
+        
+        logger.info("\nDiscovery cycle completed at %s", datetime.now())
+        logger.info("%s\n", SEPARATOR)
+    
+    async def _process_jobs(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Run jobs through classification and sponsorship analysis concurrently.
+        
+        Args:
+            jobs: Jobs that passed the location and freshness filters
+            
+        Returns:
+            Jobs that are relevant and not excluded, in input order
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM)
+        
+        async def bounded(job: Dict) -> Optional[Dict]:
+            async with semaphore:
+                return await self._process_job(job)
+        
+        results = await asyncio.gather(*(bounded(job) for job in jobs))
+        return [job for job in results if job is not None]
+    
+    async def _process_job(self, job: Dict) -> Optional[Dict]:
+        """
+        Classify one job, then analyze its sponsorship if it is relevant.
+        
+        Args:
+            job: Job dictionary; annotated in place with the results
+            
+        Returns:
+            The job if it should be kept, None if discarded
+        """
+        # Fetch full description if needed
+        if not job.get('description'):
+            job['description'] = self.discovery.fetch_job_description(job)
+        
+        category, is_entry_level, reasoning = await self.classifier.classify_job_async(job)
+        
+        job['category'] = category
+        job['is_entry_level'] = is_entry_level
+        job['entry_level_reasoning'] = reasoning
+        
+        # Discard if not relevant
+        if self.classifier.should_discard(category, is_entry_level):
+            logger.debug("  ✗ Discarded %s: %s | Entry-level: %s", job.get('title'), category, is_entry_level)
+            return None
+        
+        confidence, reasoning = await self.sponsor_analyzer.analyze_sponsorship_async(job)
+        
+        job['sponsor_confidence'] = confidence
+        job['sponsor_reasoning'] = reasoning
+        
+        # Discard excluded or low-confidence jobs
+        if confidence == 'EXCLUDED' or self.sponsor_analyzer.should_discard(confidence):
+            logger.debug("  ✗ %s at %s: %s", job.get('title'), job.get('company'), confidence)
+            return None
+        
+        logger.debug("  ✓ %s at %s: %s | Entry-level: %s | Sponsorship: %s",
+                     job.get('title'), job.get('company'), category, is_entry_level, confidence)
+        
+        # Scoring, storage and the digest don't need the full text; keep a
+        # short summary so kept jobs stop pinning multi-KB descriptions
+        description = job.pop('description', '')
+        job.pop('_description_lc', None)
+        job['description_summary'] = description[:DESCRIPTION_SUMMARY_CHARS]
         
-        print(f"\nDiscovery cycle completed at {datetime.now()}")
-        print(f"{'='*60}\n")
+        return job
     
     def send_daily_digest(self):
         """
         Send daily email digest with top jobs.
         """
-        print(f"\n{'='*60}")
-        print(f"Sending daily digest at {datetime.now()}")
-        print(f"{'='*60}\n")
+        logger.info("\n%s", SEPARATOR)
+        logger.info("Sending daily digest at %s", datetime.now())
+        logger.info("%s\n", SEPARATOR)
         
         try:
             # Get unsent jobs for digest
             jobs_for_digest = self.deduplicator.get_jobs_for_digest(max_count=12)
             
-            print(f"Found {len(jobs_for_digest)} jobs for digest")
+            logger.info("Found %s jobs for digest", len(jobs_for_digest))
             
             # Send email
             if self.recipient_email:
@@ -197,61 +230,112 @@ class JobMonitorAgent:
                 if success:
                     # Mark jobs as sent
                     self.deduplicator.mark_digest_sent(jobs_for_digest)
-                    print(f"✓ Digest sent successfully to {self.recipient_email}")
+                    logger.info("✓ Digest sent successfully to %s", self.recipient_email)
                 else:
-                    print(f"✗ Failed to send digest")
+                    logger.error("✗ Failed to send digest")
             else:
-                print("⚠ No recipient email configured, skipping email send")
-                print("Generating digest preview...")
+                logger.warning("⚠ No recipient email configured, skipping email send")
+                logger.info("Generating digest preview...")
                 
                 # Save preview to file
                 html = self.email_sender.generate_digest(jobs_for_digest)
                 preview_path = str(Path(__file__).parent / f"digest_preview_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
                 with open(preview_path, 'w') as f:
                     f.write(html)
-                print(f"  → Preview saved to {preview_path}")
+                logger.info("  → Preview saved to %s", preview_path)
             
         except Exception as e:
-            print(f"\n❌ Error sending digest: {e}")
-            traceback.print_exc()
+            logger.exception("\n❌ Error sending digest: %s", e)
         
-        print(f"\nDigest process completed at {datetime.now()}")
-        print(f"{'='*60}\n")
+        logger.info("\nDigest process completed at %s", datetime.now())
+        logger.info("%s\n", SEPARATOR)
     
     def start(self):
         """
         Start the autonomous agent with scheduled tasks.
         """
-        print("\n" + "="*60)
-        print("JOB MONITOR AGENT STARTING")
-        print("="*60)
-        print(f"Current time: {datetime.now()}")
-        print(f"Recipient email: {self.recipient_email or 'Not configured (preview mode)'}")
-        print("\nSchedule:")
-        print("  - Discovery runs: Once daily at 16:30 (4:30 PM)")
-        print("  - Daily digest: 17:00 (5:00 PM) - sent after discovery")
-        print("="*60 + "\n")
+        logger.info("\n%s", SEPARATOR)
+        logger.info("JOB MONITOR AGENT STARTING")
+        logger.info("%s", SEPARATOR)
+        logger.info("Current time: %s", datetime.now())
+        logger.info("Recipient email: %s", self.recipient_email or 'Not configured (preview mode)')
+        logger.info("\nSchedule:")
+        logger.info("  - Discovery runs: Once daily at 16:30 (4:30 PM)")
+        logger.info("  - Daily digest: 17:00 (5:00 PM) - sent after discovery")
+        logger.info("%s\n", SEPARATOR)
 
-        # Schedule discovery once per day at 4:30 PM (before digest)
-        schedule.every().day.at("16:30").do(self.run_discovery_cycle)
-
-        # Schedule daily digest at 5:00 PM (after discovery completes)
-        schedule.every().day.at("17:00").do(self.send_daily_digest)
-        
+        try:
+            asyncio.run(self._run_scheduler())
+        except KeyboardInterrupt:
+            logger.info("\n\nAgent stopped by user")
+            logger.info("%s", SEPARATOR)
+    
+    async def _run_scheduler(self):
+        """Run the initial discovery cycle, then the daily jobs forever."""
         # Run initial discovery immediately
-        print("Running initial discovery cycle...")
-        self.run_discovery_cycle()
+        logger.info("Running initial discovery cycle...")
+        await asyncio.to_thread(self.run_discovery_cycle)
         
-        # Main loop
-        print("\nAgent is now running. Press Ctrl+C to stop.\n")
+        logger.info("\nAgent is now running. Press Ctrl+C to stop.\n")
         
-        try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-        except KeyboardInterrupt:
-            print("\n\nAgent stopped by user")
-            print("="*60)
+        # Tasks run one at a time, so a discovery that overruns 5:00 PM
+        # finishes before the digest reads the database
+        task_lock = asyncio.Lock()
+        
+        await asyncio.gather(
+            # Discovery once per day at 4:30 PM (before digest)
+            self._schedule_daily(16, 30, self.run_discovery_cycle, task_lock),
+            # Daily digest at 5:00 PM (after discovery completes)
+            self._schedule_daily(17, 0, self.send_daily_digest, task_lock)
+        )
+    
+    async def _schedule_daily(self, hour: int, minute: int, task, task_lock: asyncio.Lock):
+        """
+        Run a task every day at a fixed local time.
+        
+        Sleeps until the exact fire time instead of polling, and runs the
+        blocking task in a worker thread once it holds task_lock, so
+        scheduled tasks never overlap.
+        
+        Args:
+            hour: Hour of day (0-23)
+            minute: Minute of hour (0-59)
+            task: Blocking callable to run
+            task_lock: Lock shared by every scheduled task
+        """
+        while True:
+            now = datetime.now()
+            target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target <= now:
+                target += timedelta(days=1)
+            
+            await asyncio.sleep((target - now).total_seconds())
+            async with task_lock:
+                await asyncio.to_thread(task)
+
+
+def setup_logging(level: Union[int, str] = logging.INFO) -> QueueListener:
+    """
+    Route log records through a queue to a background stderr writer.
+    
+    Callers only enqueue records; formatting and the blocking write happen
+    on the listener thread.
+    
+    Args:
+        level: Root logger level or level name (DEBUG shows per-job progress)
+        
+    Returns:
+        Started listener; call stop() on shutdown to flush pending records
+    """
+    log_queue = queue.SimpleQueue()
+    
+    # QueueHandler formats the record (including any traceback) before
+    # enqueueing, so the stderr handler just writes the finished message
+    logging.basicConfig(level=level, format='%(message)s', handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    
+    return listener
 
 
 def load_config() -> Dict:
@@ -280,6 +364,12 @@ if __name__ == '__main__':
     # Load configuration
     config = load_config()
     
-    # Create and start agent
-    agent = JobMonitorAgent(config)
-    agent.start()
+    # Same LOG_LEVEL variable as run_once.py
+    listener = setup_logging(os.getenv('LOG_LEVEL', 'INFO').upper())
+    
+    try:
+        # Create and start agent
+        agent = JobMonitorAgent(config)
+        agent.start()
+    finally:
+        listener.stop()
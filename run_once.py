@@ -3,10 +3,15 @@ Run Once - Discover jobs and send email immediately, then exit.
 Just run this script whenever you want to see the latest jobs.
 """
 
+import argparse
+import asyncio
+import logging
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime
+from typing import Dict, List, Optional
 
 # Load config
 config_path = Path(__file__).parent / 'config.env'
@@ -15,14 +20,172 @@ print(f"Loaded config from {config_path}\n")
 
 from job_discovery import JobDiscovery
 from job_classifier import JobClassifier
-from sponsorship_analyzer import SponsorshipAnalyzer
+from sponsorship_analyzer import SponsorshipAnalyzer, BATCH_FINAL_STATES
 from job_scorer import JobScorer
 from deduplicator import Deduplicator
 from email_sender import EmailDigest
 
+# Per-job progress lines; set LOG_LEVEL=WARNING to silence them
+logger = logging.getLogger(__name__)
 
-def run_once():
-    """Discover jobs and send email once, then exit."""
+
+async def process_job(job: Dict, discovery: JobDiscovery, classifier: JobClassifier,
+                      sponsor_analyzer: SponsorshipAnalyzer) -> Optional[Dict]:
+    """
+    Fetch, classify and analyze sponsorship for one job.
+
+    Returns:
+        The job, annotated in place, or None if it was discarded
+    """
+    if not job.get('description'):
+        job['description'] = discovery.fetch_job_description(job)
+
+    title = job.get('title', 'Unknown')[:50]
+
+    category, is_entry_level, reasoning = await classifier.classify_job_async(job)
+    job['category'] = category
+    job['is_entry_level'] = is_entry_level
+    job['entry_level_reasoning'] = reasoning
+
+    if classifier.should_discard(category, is_entry_level):
+        logger.info("  [SKIP] %s: %s, Entry-level: %s", title, category, is_entry_level)
+        return None
+
+    confidence, reasoning = await sponsor_analyzer.analyze_sponsorship_async(job)
+    job['sponsor_confidence'] = confidence
+    job['sponsor_reasoning'] = reasoning
+
+    if confidence == 'EXCLUDED' or sponsor_analyzer.should_discard(confidence):
+        logger.info("  [SKIP] %s: %s | %s: %s", title, category, job.get('company'), confidence)
+        return None
+
+    logger.info("  [OK] %s: %s | %s: %s", title, category, job.get('company'), confidence)
+    return job
+
+
+def candidate_priority(job: Dict, sponsor_analyzer: SponsorshipAnalyzer) -> int:
+    """Cheap pre-LLM ordering key: sponsor signals plus an entry-level title."""
+    title = job.get('title', '').lower()
+    return sponsor_analyzer.prescreen_priority(job) + ('junior' in title or 'grad' in title)
+
+
+async def process_jobs(jobs: List[Dict], discovery: JobDiscovery, classifier: JobClassifier,
+                       sponsor_analyzer: SponsorshipAnalyzer, concurrency: int = 8,
+                       limit: Optional[int] = None) -> List[Dict]:
+    """
+    Run process_job over many jobs with at most `concurrency` in flight.
+
+    Jobs start in list order; once `limit` jobs have been kept, jobs that
+    have not started yet are skipped without calling the LLM. Jobs already
+    in flight still finish, so the result is trimmed to the first `limit`.
+
+    Returns:
+        Jobs that were kept, in input order (at most `limit`)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    kept = 0
+
+    async def bounded(job: Dict) -> Optional[Dict]:
+        nonlocal kept
+        async with semaphore:
+            if limit is not None and kept >= limit:
+                return None
+            result = await process_job(job, discovery, classifier, sponsor_analyzer)
+            if result is not None:
+                kept += 1
+            return result
+
+    results = await asyncio.gather(*(bounded(job) for job in jobs))
+    return [job for job in results if job is not None][:limit]
+
+
+def classify_then_batch_sponsor(jobs: List[Dict], discovery: JobDiscovery, classifier: JobClassifier,
+                                sponsor_analyzer: SponsorshipAnalyzer, limit: Optional[int] = None,
+                                timeout: Optional[float] = None) -> List[Dict]:
+    """
+    Classify all jobs, then analyze sponsorship through the OpenAI Batch API.
+
+    Only the first `limit` relevant jobs (in list order) are submitted, the
+    batch counterpart of process_jobs' early stop. A batch still running
+    after `timeout` seconds is cancelled and the jobs are analyzed on demand.
+
+    Returns:
+        Jobs that are relevant and not excluded, in input order
+    """
+    # Step 3: Classify jobs
+    print("\nStep 3: Classifying jobs...")
+
+    for job in jobs:
+        if not job.get('description'):
+            job['description'] = discovery.fetch_job_description(job)
+
+    # Classify concurrently; results come back in input order
+    results = asyncio.run(classifier.classify_jobs(jobs))
+    classified_jobs = []
+
+    for i, (job, (category, is_entry_level, reasoning)) in enumerate(zip(jobs, results), 1):
+        logger.info("  Processing %s/%s: %s", i, len(jobs), job.get('title', 'Unknown')[:50])
+
+        job['category'] = category
+        job['is_entry_level'] = is_entry_level
+        job['entry_level_reasoning'] = reasoning
+
+        if not classifier.should_discard(category, is_entry_level):
+            classified_jobs.append(job)
+            logger.info("    [OK] %s", category)
+        else:
+            logger.info("    [SKIP] %s, Entry-level: %s", category, is_entry_level)
+
+    print(f"  {len(classified_jobs)} relevant jobs found")
+
+    if not classified_jobs:
+        return []
+
+    if limit is not None and len(classified_jobs) > limit:
+        classified_jobs = classified_jobs[:limit]
+        print(f"  Analyzing the top {limit}")
+
+    # Step 4: Analyze sponsorship
+    print("\nStep 4: Analyzing H-1B sponsorship...")
+    batch_id = sponsor_analyzer.submit_batch(classified_jobs)
+    batch = None
+    if batch_id:
+        print(f"  Submitted batch {batch_id}, waiting for results...")
+        batch = sponsor_analyzer.poll_batch(batch_id, timeout=timeout)
+
+    if batch is not None and batch.status not in BATCH_FINAL_STATES:
+        print(f"  Batch still {batch.status} after {timeout / 60:.0f} min, cancelling; analyzing on demand")
+        sponsor_analyzer.cancel_batch(batch_id)
+        results = [sponsor_analyzer.analyze_sponsorship(job) for job in classified_jobs]
+    else:
+        results = sponsor_analyzer.collect_batch(batch_id, classified_jobs)
+    sponsored_jobs = []
+
+    for job, (confidence, reasoning) in zip(classified_jobs, results):
+        job['sponsor_confidence'] = confidence
+        job['sponsor_reasoning'] = reasoning
+
+        if confidence != 'EXCLUDED' and not sponsor_analyzer.should_discard(confidence):
+            sponsored_jobs.append(job)
+            logger.info("  [OK] %s: %s", job.get('company'), confidence)
+        else:
+            logger.info("  [SKIP] %s: %s", job.get('company'), confidence)
+
+    return sponsored_jobs
+
+
+def run_once(use_batch: bool = False, concurrency: int = 8, batch_timeout: float = 60 * 60):
+    """
+    Discover jobs and send email once, then exit.
+
+    Args:
+        use_batch: Analyze sponsorship through the OpenAI Batch API (cheaper,
+            but waits until the batch finishes; meant for large backfills)
+        concurrency: Jobs processed at once; the work is waiting on the
+            OpenAI API, so raise it as far as the account's rate limit allows
+        batch_timeout: Seconds to wait for the batch before cancelling it
+            and analyzing on demand
+    """
 
     print("="*60)
     print("JOB MONITOR - ONE TIME RUN")
@@ -32,11 +195,11 @@ def run_once():
     # Initialize modules
     db_path = os.getenv('JOB_MONITOR_DB_PATH', str(Path(__file__).parent / 'jobs.db'))
 
+    deduplicator = Deduplicator(db_path)
     discovery = JobDiscovery()
-    classifier = JobClassifier()
-    sponsor_analyzer = SponsorshipAnalyzer()
+    classifier = JobClassifier(deduplicator.db)
+    sponsor_analyzer = SponsorshipAnalyzer(deduplicator.db)
     scorer = JobScorer()
-    deduplicator = Deduplicator(db_path)
 
     email_sender = EmailDigest(
         smtp_server=os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
@@ -63,61 +226,36 @@ def run_once():
     else:
         # Step 2: Filter for US locations and 24-hour freshness
         print("\nStep 2: Filtering for US locations and freshness...")
-        us_jobs = [
-            job for job in raw_jobs
-            if discovery.is_us_location(job.get('location', ''))
-            and discovery.is_within_24_hours(job.get('posted_date'))
-        ]
+        us_jobs = discovery.filter_us_recent(raw_jobs)
         print(f"  {len(us_jobs)} jobs meet location and freshness criteria")
 
+        # Skip postings stored by earlier runs before paying for the LLM
+        us_jobs = deduplicator.filter_known(us_jobs)
+        print(f"  {len(us_jobs)} of them are not in the database yet")
+
         if us_jobs:
-            # Step 3: Classify jobs
-            print("\nStep 3: Classifying jobs...")
-            classified_jobs = []
-
-            for i, job in enumerate(us_jobs[:20], 1):
-                print(f"  Processing {i}/{min(len(us_jobs), 20)}: {job.get('title', 'Unknown')[:50]}")
-
-                if not job.get('description'):
-                    job['description'] = discovery.fetch_job_description(job)
-
-                category, is_entry_level, reasoning = classifier.classify_job(job)
-                job['category'] = category
-                job['is_entry_level'] = is_entry_level
-                job['entry_level_reasoning'] = reasoning
-
-                if not classifier.should_discard(category, is_entry_level):
-                    classified_jobs.append(job)
-                    print(f"    [OK] {category}")
-                else:
-                    print(f"    [SKIP] {category}, Entry-level: {is_entry_level}")
-
-            print(f"  {len(classified_jobs)} relevant jobs found")
-
-            if classified_jobs:
-                # Step 4: Analyze sponsorship
-                print("\nStep 4: Analyzing H-1B sponsorship...")
-                sponsored_jobs = []
-
-                for job in classified_jobs:
-                    confidence, reasoning = sponsor_analyzer.analyze_sponsorship(job)
-                    job['sponsor_confidence'] = confidence
-                    job['sponsor_reasoning'] = reasoning
-
-                    if confidence != 'EXCLUDED' and not sponsor_analyzer.should_discard(confidence):
-                        sponsored_jobs.append(job)
-                        print(f"  [OK] {job.get('company')}: {confidence}")
-                    else:
-                        print(f"  [SKIP] {job.get('company')}: {confidence}")
-
-                print(f"  {len(sponsored_jobs)} jobs with sponsorship potential")
-
-                if sponsored_jobs:
-                    # Step 5: Score and store
-                    print("\nStep 5: Scoring and storing...")
-                    scored_jobs = scorer.rank_jobs(sponsored_jobs)
-                    new_jobs = deduplicator.filter_duplicates(scored_jobs)
-                    print(f"  {len(new_jobs)} new jobs added to database")
+            # Most promising first, so the digest fills before the cap
+            us_jobs.sort(key=lambda job: candidate_priority(job, sponsor_analyzer), reverse=True)
+            batch = us_jobs[:20]
+
+            if use_batch:
+                sponsored_jobs = classify_then_batch_sponsor(batch, discovery, classifier, sponsor_analyzer,
+                                                             limit=12, timeout=batch_timeout)
+            else:
+                # Steps 3-4: each job runs fetch -> classify -> sponsorship on
+                # its own, concurrently with the others
+                print("\nSteps 3-4: Classifying jobs and analyzing H-1B sponsorship...")
+                sponsored_jobs = asyncio.run(process_jobs(batch, discovery, classifier, sponsor_analyzer,
+                                                          concurrency=concurrency, limit=12))
+
+            print(f"  {len(sponsored_jobs)} jobs with sponsorship potential")
+
+            if sponsored_jobs:
+                # Step 5: Score and store
+                print("\nStep 5: Scoring and storing...")
+                scored_jobs = scorer.rank_jobs(sponsored_jobs)
+                new_jobs = deduplicator.filter_duplicates(scored_jobs)
+                print(f"  {len(new_jobs)} new jobs added to database")
 
         # Get jobs for digest (including any from previous runs)
         jobs_for_digest = deduplicator.get_jobs_for_digest(max_count=12)
@@ -151,4 +289,15 @@ def run_once():
 
 
 if __name__ == '__main__':
-    run_once()
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--batch', action='store_true',
+                            help='analyze sponsorship via the OpenAI Batch API (slower, half the cost)')
+    arg_parser.add_argument('--concurrency', type=int, default=8,
+                            help='jobs to classify and analyze at once (default: 8)')
+    arg_parser.add_argument('--batch-timeout', type=float, default=60, metavar='MINUTES',
+                            help='minutes to wait for a --batch run before analyzing on demand (default: 60)')
+    args = arg_parser.parse_args()
+
+    # Same stream as the step banners so the lines stay in order
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s', stream=sys.stdout)
+    run_once(use_batch=args.batch, concurrency=args.concurrency, batch_timeout=args.batch_timeout * 60)
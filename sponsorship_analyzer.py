@@ -4,26 +4,186 @@ H-1B Sponsorship Analyzer Module
 Infers H-1B sponsorship likelihood using company data and textual analysis.
 """
 
-from openai import OpenAI
-from typing import Dict, Tuple, Optional
+from openai import OpenAI, AsyncOpenAI
+from typing import Dict, Iterable, List, Tuple, Optional
+import asyncio
+import hashlib
 import json
 import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from deduplicator import JobDatabase
+
+# Known sponsor-friendly companies (can be expanded)
+HIGH_SPONSOR_COMPANIES = frozenset({
+    'google', 'microsoft', 'amazon', 'meta', 'apple', 'netflix',
+    'goldman sachs', 'jpmorgan', 'morgan stanley', 'citadel',
+    'jane street', 'two sigma', 'de shaw', 'jump trading',
+    'databricks', 'snowflake', 'stripe', 'airbnb', 'uber',
+    'capital one', 'american express', 'visa', 'mastercard'
+})
+
+# Company name terms that suggest sponsorship: large tech companies,
+# financial institutions, consulting firms
+SPONSOR_INDICATORS = (
+    'technologies', 'tech', 'software', 'systems',
+    'capital', 'financial', 'bank', 'securities',
+    'consulting', 'analytics', 'data', 'research'
+)
+
+# Known sponsors are matched as whole words: one-word names by token set
+# lookup, the few multi-word names by a word-bounded alternation
+_COMPANY_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_SPONSOR_SINGLE = frozenset(name for name in HIGH_SPONSOR_COMPANIES if ' ' not in name)
+_SPONSOR_MULTI_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(name) for name in sorted(HIGH_SPONSOR_COMPANIES - _SPONSOR_SINGLE)) + r')\b'
+)
+
+# Indicators stay substring matches ("fintech", "datarobot"), in one pass
+_SPONSOR_INDICATOR_RE = re.compile('|'.join(map(re.escape, SPONSOR_INDICATORS)))
+
+# Text signals decided without (or despite) the LLM
+POSITIVE_TEXT_SIGNAL = ('HIGH', 'Job description explicitly mentions visa sponsorship')
+UNKNOWN_TEXT_SIGNAL = ('LOW', 'Unable to determine sponsorship likelihood')
+
+# Description sections that carry visa / work-authorization signal; each
+# match is the header plus up to 800 characters after it
+_ELIGIBILITY_RE = re.compile(
+    r'(?is)(?:requirements|eligibility|work authorization|visa|sponsorship)[:\n].{0,800}'
+)
+ELIGIBILITY_MAX_CHARS = 2000
+ELIGIBILITY_FALLBACK_CHARS = 1500
+
+# Sponsorship prompts need a two-field answer; a small model with
+# schema-enforced output is enough
+SPONSOR_MODEL = "gpt-4.1-nano"
+
+SIGNAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "signal": {"type": "string", "enum": ["HIGH", "MEDIUM", "LOW"]},
+        "reasoning": {"type": "string"}
+    },
+    "required": ["signal", "reasoning"],
+    "additionalProperties": False
+}
+
+# Final confidence per (company signal, text signal). Precomputed from a
+# weighted average of HIGH=3, MEDIUM=2, LOW=1 (company 0.6, text 0.4),
+# bucketed at >= 2.5 HIGH and >= 1.8 MEDIUM
+_SIGNAL_LEVELS = ('HIGH', 'MEDIUM', 'LOW')
+_CONFIDENCE_TABLE = {
+    ('HIGH', 'HIGH'): 'HIGH',
+    ('HIGH', 'MEDIUM'): 'HIGH',
+    ('HIGH', 'LOW'): 'MEDIUM',
+    ('MEDIUM', 'HIGH'): 'MEDIUM',
+    ('MEDIUM', 'MEDIUM'): 'MEDIUM',
+    ('MEDIUM', 'LOW'): 'LOW',
+    ('LOW', 'HIGH'): 'MEDIUM',
+    ('LOW', 'MEDIUM'): 'LOW',
+    ('LOW', 'LOW'): 'LOW'
+}
+
+# Descriptions shorter than this hold too little text for the LLM to
+# lift a company that is not on the sponsor list
+MIN_ANALYZABLE_CHARS = 400
+
+# LLM text signals remembered per analyzer, keyed by posting content
+TEXT_CACHE_SIZE = 4096
+
+# Text signals persisted in the job database are trusted for a week
+SPONSOR_CACHE_MAX_AGE = 7 * 24 * 3600
+
+# OpenAI Batch API states after which a batch will not change
+BATCH_FINAL_STATES = frozenset({'completed', 'failed', 'expired', 'cancelled'})
+
+
+def _lowered(job: Dict, field: str) -> str:
+    """Lowercased job field, reusing the copy JobDiscovery precomputes."""
+    lowered = job.get(f'_{field}_lc')
+    if lowered is None:
+        lowered = job.get(field, '').lower()
+    return lowered
+
+
+def _extract_eligibility(description: str) -> str:
+    """
+    Reduce a description to its eligibility-related sections for the LLM.
+    
+    Benefits and EEO boilerplate often fill the start of a posting; sending
+    only the requirements / authorization sections cuts input tokens while
+    keeping the text that matters for sponsorship.
+    
+    Args:
+        description: Full job description
+        
+    Returns:
+        Matching sections joined (capped at ELIGIBILITY_MAX_CHARS), or the
+        start of the description if no section header is found
+    """
+    sections = _ELIGIBILITY_RE.findall(description)
+    if not sections:
+        return description[:ELIGIBILITY_FALLBACK_CHARS]
+    return '\n...\n'.join(sections)[:ELIGIBILITY_MAX_CHARS]
+
+
+def _text_cache_key(job: Dict) -> Tuple[str, str, str]:
+    """
+    Identify a posting by what the LLM sees, so reposts share one analysis.
+    
+    Returns:
+        Tuple of (company, whitespace-normalized title, hash of the
+        description text sent to the LLM)
+    """
+    description = _extract_eligibility(job.get('description', ''))
+    return (
+        _lowered(job, 'company').strip(),
+        ' '.join(job.get('title', '').lower().split()),
+        hashlib.blake2b(description.encode(), digest_size=8).hexdigest()
+    )
+
+
+@lru_cache(maxsize=1024)
+def _company_signal(company_norm: str) -> str:
+    """Company-level sponsorship signal for a normalized (lowercase) name."""
+    # Check against known sponsor-friendly companies
+    if not _SPONSOR_SINGLE.isdisjoint(_COMPANY_TOKEN_RE.findall(company_norm)):
+        return 'HIGH'
+    if _SPONSOR_MULTI_RE.search(company_norm):
+        return 'HIGH'
+    
+    if _SPONSOR_INDICATOR_RE.search(company_norm):
+        return 'MEDIUM'
+    
+    return 'LOW'
 
 
 class SponsorshipAnalyzer:
     """Analyzes H-1B sponsorship likelihood for job postings."""
     
-    def __init__(self):
-        self.client = OpenAI()
+    # Sync OpenAI client shared by every analyzer in the process, so its
+    # connection pool (and kept-alive TLS sessions) is reused
+    _client: Optional[OpenAI] = None
+    
+    def __init__(self, db: Optional[JobDatabase] = None):
+        """
+        Initialize the analyzer.
         
-        # Known sponsor-friendly companies (can be expanded)
-        self.high_sponsor_companies = {
-            'google', 'microsoft', 'amazon', 'meta', 'apple', 'netflix',
-            'goldman sachs', 'jpmorgan', 'morgan stanley', 'citadel',
-            'jane street', 'two sigma', 'de shaw', 'jump trading',
-            'databricks', 'snowflake', 'stripe', 'airbnb', 'uber',
-            'capital one', 'american express', 'visa', 'mastercard'
-        }
+        Args:
+            db: Optional job database used to persist LLM text signals
+        """
+        cls = type(self)
+        if cls._client is None:
+            cls._client = OpenAI()
+        self.client = cls._client
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.db = db
+        
+        # LRU of LLM text signals by _text_cache_key
+        self._text_cache: 'OrderedDict[Tuple[str, str, str], Tuple[str, str]]' = OrderedDict()
         
         # Hard exclusion patterns
         self.exclusion_patterns = [
@@ -44,6 +204,29 @@ class SponsorshipAnalyzer:
             r'h-?1b\s+sponsorship',
             r'work\s+authorization\s+provided'
         ]
+        
+        # Each pattern list compiled into one alternation: a single scan per text
+        self._exclusion_re = self._compile_union(self.exclusion_patterns)
+        self._positive_re = self._compile_union(self.positive_patterns)
+    
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        AsyncOpenAI client for the running event loop.
+        
+        An async client's connections belong to the loop that opened them,
+        so it can't be shared across asyncio.run() calls or at class level.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = AsyncOpenAI()
+            self._async_loop = loop
+        return self._async_client
+    
+    @staticmethod
+    def _compile_union(patterns: List[str]) -> 're.Pattern':
+        """Compile patterns into one case-insensitive alternation."""
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
     
     def analyze_sponsorship(self, job: Dict) -> Tuple[str, str]:
         """
@@ -56,71 +239,374 @@ class SponsorshipAnalyzer:
             Tuple of (confidence_level, reasoning)
             confidence_level: 'HIGH', 'MEDIUM', or 'LOW'
         """
-        company = job.get('company', '').lower()
-        description = job.get('description', '').lower()
-        title = job.get('title', '').lower()
+        company = _lowered(job, 'company')
+        description = _lowered(job, 'description')
         
         # STEP 1: Hard exclusion check
         if self._has_exclusionary_language(description):
             return 'EXCLUDED', 'Job explicitly states no visa sponsorship'
         
-        # STEP 2: Company-level signal
-        company_signal = self._get_company_signal(company)
+        # STEP 2: Company-level signal (company is already lowercase)
+        company_signal = _company_signal(company.strip())
+        
+        decided = self._decide_from_company(job, company_signal, description)
+        if decided:
+            return decided
         
         # STEP 3: Textual signal (LLM analysis)
-        text_signal, text_reasoning = self._analyze_text_signals(job)
+        text_signal, text_reasoning = self._analyze_text_signals(job, description)
         
         # Combine signals to determine final confidence
         confidence, reasoning = self._combine_signals(company_signal, text_signal, text_reasoning)
         
         return confidence, reasoning
     
+    async def analyze_sponsorship_async(self, job: Dict) -> Tuple[str, str]:
+        """
+        Async variant of analyze_sponsorship; only the LLM call is awaited.
+        
+        Args:
+            job: Job dictionary with company, title, description
+            
+        Returns:
+            Tuple of (confidence_level, reasoning)
+        """
+        company = _lowered(job, 'company')
+        description = _lowered(job, 'description')
+        
+        if self._has_exclusionary_language(description):
+            return 'EXCLUDED', 'Job explicitly states no visa sponsorship'
+        
+        company_signal = _company_signal(company.strip())
+        decided = self._decide_from_company(job, company_signal, description)
+        if decided:
+            return decided
+        
+        text_signal, text_reasoning = await self._analyze_text_signals_async(job, description)
+        
+        return self._combine_signals(company_signal, text_signal, text_reasoning)
+    
+    def submit_batch(self, jobs: List[Dict]) -> Optional[str]:
+        """
+        Submit the jobs that need the LLM to the OpenAI Batch API.
+        
+        Batch requests cost half as much and use a separate rate limit, but
+        finish within 24 hours rather than immediately; use for large
+        backfills. Pair with poll_batch and collect_batch.
+        
+        Args:
+            jobs: List of job dictionaries with company, title, description
+            
+        Returns:
+            Batch ID, or None if every job was decided without the LLM
+        """
+        _, _, pending = self._presort_batch(jobs)
+        if not pending:
+            return None
+        
+        lines = [
+            json.dumps({
+                'custom_id': f'job-{i}',
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': self._build_llm_request(jobs[i])
+            }, ensure_ascii=False)
+            for i in pending
+        ]
+        
+        batch_file = self.client.files.create(
+            file=('sponsorship_batch.jsonl', '\n'.join(lines).encode()),
+            purpose='batch'
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        
+        return batch.id
+    
+    def poll_batch(self, batch_id: str, interval: float = 60, timeout: Optional[float] = None):
+        """
+        Wait for a submitted batch to finish.
+        
+        Args:
+            batch_id: ID returned by submit_batch
+            interval: Seconds between status checks
+            timeout: Give up after this many seconds (None waits for the
+                whole completion window)
+            
+        Returns:
+            The final batch object, or the still-running one on timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in BATCH_FINAL_STATES:
+                return batch
+            if deadline is None:
+                time.sleep(interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch
+            time.sleep(min(interval, remaining))
+    
+    def cancel_batch(self, batch_id: str):
+        """Cancel a submitted batch whose results are no longer wanted."""
+        try:
+            self.client.batches.cancel(batch_id)
+        except Exception as e:
+            print(f"Error cancelling sponsorship batch {batch_id}: {e}")
+    
+    def collect_batch(self, batch_id: Optional[str], jobs: List[Dict]) -> List[Tuple[str, str]]:
+        """
+        Combine a finished batch's results into sponsorship confidences.
+        
+        Args:
+            batch_id: ID returned by submit_batch for these jobs (None if
+                nothing was submitted)
+            jobs: The same job list that was passed to submit_batch
+            
+        Returns:
+            List of (confidence_level, reasoning) aligned with jobs
+        """
+        results, text_signals, pending = self._presort_batch(jobs)
+        text_signals.update((i, UNKNOWN_TEXT_SIGNAL) for i in pending)
+        
+        if batch_id:
+            try:
+                batch = self.client.batches.retrieve(batch_id)
+                if batch.status != 'completed' or not batch.output_file_id:
+                    print(f"Sponsorship batch {batch_id} ended as {batch.status}")
+                else:
+                    output = self.client.files.content(batch.output_file_id).text
+                    for line in output.splitlines():
+                        record = json.loads(line)
+                        i = int(record['custom_id'].removeprefix('job-'))
+                        body = (record.get('response') or {}).get('body') or {}
+                        if i in text_signals and body.get('choices'):
+                            result = self._parse_llm_text(body['choices'][0]['message']['content'])
+                            if result:
+                                text_signals[i] = result
+                                
+            except Exception as e:
+                print(f"Error collecting sponsorship batch {batch_id}: {e}")
+        
+        return self._finish_batch(jobs, results, text_signals, pending)
+    
+    def _presort_batch(self, jobs: List[Dict]) -> Tuple[List[Optional[Tuple[str, str]]], Dict[int, Tuple[str, str]], List[int]]:
+        """
+        Decide what can be decided without the LLM.
+        
+        Returns:
+            Tuple of (results with exclusions and company-decided jobs
+            filled in, text signals found locally by job index, indices
+            that still need the LLM)
+        """
+        results: List[Optional[Tuple[str, str]]] = [None] * len(jobs)
+        text_signals: Dict[int, Tuple[str, str]] = {}
+        pending = []
+        pending_keys = set()
+        
+        for i, job in enumerate(jobs):
+            description = _lowered(job, 'description')
+            if self._has_exclusionary_language(description):
+                results[i] = ('EXCLUDED', 'Job explicitly states no visa sponsorship')
+                continue
+            
+            company_signal = _company_signal(_lowered(job, 'company').strip())
+            decided = self._decide_from_company(job, company_signal, description)
+            if decided:
+                results[i] = decided
+            elif self._has_positive_signal(job, description):
+                text_signals[i] = POSITIVE_TEXT_SIGNAL
+            else:
+                key = _text_cache_key(job)
+                cached = self._recall_text_signal(key, job)
+                if cached:
+                    text_signals[i] = cached
+                elif key not in pending_keys:
+                    # Reposts of a pending job are filled from the cache
+                    # by _finish_batch once the first copy is analyzed
+                    pending_keys.add(key)
+                    pending.append(i)
+        
+        return results, text_signals, pending
+    
+    def _finish_batch(self, jobs: List[Dict], results: List, text_signals: Dict[int, Tuple[str, str]],
+                      analyzed: List[int]) -> List[Tuple[str, str]]:
+        """
+        Combine each job's text signal with its company signal.
+        
+        Signals at the analyzed indices came from the LLM and are persisted.
+        """
+        for i, text_signal in text_signals.items():
+            self._remember_text_signal(_text_cache_key(jobs[i]), text_signal)
+        self._persist_text_signals((jobs[i], text_signals[i]) for i in analyzed if i in text_signals)
+        
+        for i, job in enumerate(jobs):
+            if results[i] is None:
+                text_signal, text_reasoning = (
+                    text_signals.get(i)
+                    or self._recall_text_signal(_text_cache_key(job), job)
+                    or UNKNOWN_TEXT_SIGNAL
+                )
+                company_signal = _company_signal(_lowered(job, 'company').strip())
+                results[i] = self._combine_signals(company_signal, text_signal, text_reasoning)
+        
+        return results
+    
+    def _recall_text_signal(self, key: Tuple[str, str, str], job: Dict) -> Optional[Tuple[str, str]]:
+        """Look up a remembered LLM text signal, then the database cache."""
+        signal = self._recent_text_signal(key)
+        if signal is None and self.db is not None:
+            signal = self._stored_text_signal(key, job)
+            if signal:
+                self._remember_text_signal(key, signal)
+        return signal
+    
+    async def _recall_text_signal_async(self, key: Tuple[str, str, str], job: Dict) -> Optional[Tuple[str, str]]:
+        """Async variant of _recall_text_signal; the database lookup runs in a worker thread."""
+        signal = self._recent_text_signal(key)
+        if signal is None and self.db is not None:
+            signal = await asyncio.to_thread(self._stored_text_signal, key, job)
+            if signal:
+                self._remember_text_signal(key, signal)
+        return signal
+    
+    def _recent_text_signal(self, key: Tuple[str, str, str]) -> Optional[Tuple[str, str]]:
+        """Look up an LLM text signal in the in-memory LRU."""
+        signal = self._text_cache.get(key)
+        if signal:
+            self._text_cache.move_to_end(key)
+        return signal
+    
+    def _stored_text_signal(self, key: Tuple[str, str, str], job: Dict) -> Optional[Tuple[str, str]]:
+        """Look up a persisted LLM text signal younger than SPONSOR_CACHE_MAX_AGE."""
+        return self.db.get_sponsor_signal(self._sponsor_cache_key(key, job), SPONSOR_CACHE_MAX_AGE)
+    
+    def _sponsor_cache_key(self, key: Tuple[str, str, str], job: Dict) -> str:
+        """
+        Database key for a text signal: the job hash plus the description hash
+        from _text_cache_key, so a repost with changed eligibility text misses.
+        """
+        return f"{self.db._generate_job_hash(job)}:{key[2]}"
+    
+    def _remember_text_signal(self, key: Tuple[str, str, str], signal: Tuple[str, str]):
+        """Remember an LLM text signal; failed analyses are not cached."""
+        if signal == UNKNOWN_TEXT_SIGNAL:
+            return
+        self._text_cache[key] = signal
+        self._text_cache.move_to_end(key)
+        if len(self._text_cache) > TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+    
+    def _persist_text_signals(self, signals: Iterable[Tuple[Dict, Tuple[str, str]]]):
+        """Write fresh LLM text signals to the database cache; failed analyses are skipped."""
+        if self.db is None:
+            return
+        rows = {
+            self._sponsor_cache_key(_text_cache_key(job), job): signal
+            for job, signal in signals
+            if signal != UNKNOWN_TEXT_SIGNAL
+        }
+        if rows:
+            self.db.put_sponsor_signals(rows)
+    
+    def _decide_from_company(self, job: Dict, company_signal: str, description: str) -> Optional[Tuple[str, str]]:
+        """
+        Settle confidence from the company signal when the text cannot move it.
+        
+        Call only after the exclusion check. Returns None when the LLM is needed.
+        """
+        if company_signal == 'HIGH':
+            return 'HIGH', 'Known sponsor-friendly company'
+        
+        if (company_signal == 'LOW' and len(description) < MIN_ANALYZABLE_CHARS
+                and not self._has_positive_signal(job, description)):
+            return 'LOW', 'Insufficient description, company not on sponsor list'
+        
+        return None
+    
     def _has_exclusionary_language(self, description: str) -> bool:
         """Check if description contains hard exclusion patterns."""
-        for pattern in self.exclusion_patterns:
-            if re.search(pattern, description, re.IGNORECASE):
-                return True
-        return False
+        return self._exclusion_re.search(description) is not None
     
     def _get_company_signal(self, company: str) -> str:
-        """Get company-level sponsorship signal."""
-        company_lower = company.lower()
-        
-        # Check against known sponsor-friendly companies
-        for known_sponsor in self.high_sponsor_companies:
-            if known_sponsor in company_lower:
-                return 'HIGH'
-        
-        # Check for company characteristics that suggest sponsorship
-        # Large tech companies, financial institutions, consulting firms
-        sponsor_indicators = [
-            'technologies', 'tech', 'software', 'systems',
-            'capital', 'financial', 'bank', 'securities',
-            'consulting', 'analytics', 'data', 'research'
-        ]
-        
-        if any(indicator in company_lower for indicator in sponsor_indicators):
-            return 'MEDIUM'
+        """
+        Get company-level sponsorship signal (memoized per company name).
         
-        return 'LOW'
+        Accepts any casing; internal callers that already hold the lowercased
+        name call _company_signal directly.
+        """
+        return _company_signal(company.strip().lower())
     
-    def _analyze_text_signals(self, job: Dict) -> Tuple[str, str]:
+    def _analyze_text_signals(self, job: Dict, description_lower: Optional[str] = None) -> Tuple[str, str]:
         """Use LLM to analyze textual signals for sponsorship likelihood."""
-        title = job.get('title', '')
-        company = job.get('company', '')
-        description = job.get('description', '')[:2000]  # Limit length
-        
         # Check for positive patterns first
-        description_lower = description.lower()
-        has_positive_signal = any(
-            re.search(pattern, description_lower) 
-            for pattern in self.positive_patterns
-        )
+        if self._has_positive_signal(job, description_lower):
+            return POSITIVE_TEXT_SIGNAL
         
-        if has_positive_signal:
-            return 'HIGH', 'Job description explicitly mentions visa sponsorship'
+        # Reuse the analysis of an identical posting
+        key = _text_cache_key(job)
+        cached = self._recall_text_signal(key, job)
+        if cached:
+            return cached
         
         # Use LLM for nuanced analysis
+        try:
+            response = self.client.chat.completions.create(**self._build_llm_request(job))
+            result = self._parse_llm_response(response)
+            if result:
+                self._remember_text_signal(key, result)
+                self._persist_text_signals([(job, result)])
+                return result
+                
+        except Exception as e:
+            print(f"Error in LLM sponsorship analysis: {e}")
+        
+        return UNKNOWN_TEXT_SIGNAL
+    
+    async def _analyze_text_signals_async(self, job: Dict, description_lower: Optional[str] = None) -> Tuple[str, str]:
+        """Async variant of _analyze_text_signals using the AsyncOpenAI client."""
+        if self._has_positive_signal(job, description_lower):
+            return POSITIVE_TEXT_SIGNAL
+        
+        # SQLite calls block, so the database cache is used off the event loop
+        key = _text_cache_key(job)
+        cached = await self._recall_text_signal_async(key, job)
+        if cached:
+            return cached
+        
+        try:
+            response = await self.async_client.chat.completions.create(**self._build_llm_request(job))
+            result = self._parse_llm_response(response)
+            if result:
+                self._remember_text_signal(key, result)
+                await asyncio.to_thread(self._persist_text_signals, [(job, result)])
+                return result
+                
+        except Exception as e:
+            print(f"Error in LLM sponsorship analysis: {e}")
+        
+        return UNKNOWN_TEXT_SIGNAL
+    
+    def _has_positive_signal(self, job: Dict, description_lower: Optional[str] = None) -> bool:
+        """Check if the (truncated) description explicitly offers sponsorship."""
+        if description_lower is None:
+            description_lower = job.get('_description_lc')
+        if description_lower is None:
+            # Only the head is searched, so lowercase just that slice
+            description_lower = job.get('description', '')[:2000].lower()
+        return self._positive_re.search(description_lower, 0, 2000) is not None
+    
+    def _build_llm_request(self, job: Dict) -> Dict:
+        """Build chat completion arguments for sponsorship analysis."""
+        title = job.get('title', '')
+        company = job.get('company', '')
+        description = _extract_eligibility(job.get('description', ''))
+        
         prompt = f"""Analyze this job posting for H-1B visa sponsorship likelihood.
 
 Job Title: {title}
@@ -142,49 +628,39 @@ Respond in JSON format:
   "reasoning": "Brief explanation"
 }}"""
         
+        return {
+            'model': SPONSOR_MODEL,
+            'messages': [
+                {"role": "system", "content": "You are an expert in H-1B visa sponsorship patterns and employer practices."},
+                {"role": "user", "content": prompt}
+            ],
+            'response_format': {
+                'type': 'json_schema',
+                'json_schema': {'name': 'sponsorship_signal', 'schema': SIGNAL_SCHEMA, 'strict': True}
+            },
+            'temperature': 0.3,
+            'max_tokens': 200
+        }
+    
+    def _parse_llm_response(self, response) -> Optional[Tuple[str, str]]:
+        """Extract (signal, reasoning) from an LLM response, or None if absent."""
+        return self._parse_llm_text(response.choices[0].message.content)
+    
+    def _parse_llm_text(self, result_text: str) -> Optional[Tuple[str, str]]:
+        """Extract (signal, reasoning) from SIGNAL_SCHEMA JSON, or None if unusable."""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert in H-1B visa sponsorship patterns and employer practices."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=200
-            )
-            
-            result_text = response.choices[0].message.content.strip()
-            
-            # Extract JSON
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                signal = result.get('signal', 'LOW')
-                reasoning = result.get('reasoning', '')
-                return signal, reasoning
-                
-        except Exception as e:
-            print(f"Error in LLM sponsorship analysis: {e}")
-        
-        return 'LOW', 'Unable to determine sponsorship likelihood'
+            result = json.loads(result_text)
+            return result['signal'], result['reasoning']
+        except (ValueError, TypeError, KeyError):
+            return None
     
     def _combine_signals(self, company_signal: str, text_signal: str, text_reasoning: str) -> Tuple[str, str]:
         """Combine company and text signals to determine final confidence."""
-        signal_scores = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
-        
-        company_score = signal_scores.get(company_signal, 1)
-        text_score = signal_scores.get(text_signal, 1)
-        
-        # Weighted average (company signal weighted slightly higher)
-        combined_score = (company_score * 0.6 + text_score * 0.4)
-        
-        # Determine final confidence
-        if combined_score >= 2.5:
-            confidence = 'HIGH'
-        elif combined_score >= 1.8:
-            confidence = 'MEDIUM'
-        else:
-            confidence = 'LOW'
+        # Unrecognized signals count as LOW
+        confidence = _CONFIDENCE_TABLE.get((company_signal, text_signal)) or _CONFIDENCE_TABLE[(
+            company_signal if company_signal in _SIGNAL_LEVELS else 'LOW',
+            text_signal if text_signal in _SIGNAL_LEVELS else 'LOW'
+        )]
         
         # Build reasoning
         reasoning_parts = []
@@ -200,6 +676,16 @@ Respond in JSON format:
         
         return confidence, reasoning
     
+    def prescreen_priority(self, job: Dict) -> int:
+        """
+        Cheap, LLM-free estimate of a job's sponsorship potential for ordering work.
+        
+        Returns:
+            2 for a known sponsor, plus 1 if the description offers sponsorship
+        """
+        priority = 2 if _company_signal(_lowered(job, 'company').strip()) == 'HIGH' else 0
+        return priority + self._has_positive_signal(job)
+    
     def should_discard(self, confidence: str, job_score: float = 0) -> bool:
         """
         Determine if job should be discarded based on sponsorship confidence.
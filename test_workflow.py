@@ -2,7 +2,10 @@
 Test script to validate the job monitoring workflow.
 """
 
+import hashlib
+import sqlite3
 import sys
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -137,7 +140,7 @@ print("="*60)
 print("TEST 5: Deduplication Module")
 print("="*60)
 try:
-    dedup = Deduplicator('test_jobs.db')
+    dedup = Deduplicator(':memory:')  # Fresh, disk-free database on every run
     
     # Test hash generation
     job1 = {'company': 'Google', 'title': 'Data Scientist'}
@@ -173,6 +176,61 @@ try:
     assert job_id2 is None  # Duplicate should return None
     print("[OK] Duplicate detection working")
     
+    # Test migration of a database written with SHA-256 hashes
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path = str(Path(tmp_dir) / 'legacy.db')
+        conn = sqlite3.connect(legacy_path)
+        conn.execute('''
+            CREATE TABLE jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_hash TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                company TEXT NOT NULL,
+                location TEXT,
+                category TEXT,
+                source TEXT,
+                url TEXT,
+                description TEXT,
+                posted_date TEXT,
+                discovered_date TEXT NOT NULL,
+                sponsor_confidence TEXT,
+                entry_level_reasoning TEXT,
+                score REAL,
+                sent_in_digest INTEGER DEFAULT 0,
+                sent_date TEXT
+            )
+        ''')
+        # "Straße" and "STRASSE" differ under lower() but collide under casefold()
+        legacy_jobs = [('Straße AG', 'Data Scientist'), ('STRASSE AG', 'Data Scientist'),
+                       ('Google', 'Data Analyst')]
+        conn.executemany(
+            'INSERT INTO jobs (job_hash, title, company, discovered_date) VALUES (?, ?, ?, ?)',
+            [(hashlib.sha256(f"{company.lower().strip()}|{title.lower().strip()}".encode()).hexdigest(),
+              title, company, datetime.now().isoformat())
+             for company, title in legacy_jobs]
+        )
+        conn.commit()
+        conn.close()
+        
+        legacy = Deduplicator(legacy_path)
+        migrated = legacy.db._ro_conn.execute('SELECT company, length(job_hash) FROM jobs ORDER BY id').fetchall()
+        assert legacy.db._ro_conn.execute('PRAGMA user_version').fetchone()[0] == 1
+        assert migrated == [('Straße AG', 32), ('Google', 32)]  # Lowest id kept on collision
+        print("[OK] Legacy hash migration working")
+        
+        # Test bulk insert: stored, new, and repeated-in-batch jobs
+        new_job = {'company': 'Microsoft', 'title': 'Data Engineer'}
+        job_ids = legacy.db.add_jobs_bulk([
+            {'company': 'STRASSE AG', 'title': 'Data Scientist'},
+            new_job,
+            dict(new_job)
+        ])
+        assert job_ids[0] is None and job_ids[2] is None
+        assert job_ids[1] is not None
+        assert legacy.db._ro_conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 3
+        legacy.db.close()
+        print("[OK] Bulk insert working")
+    
     print("[OK] Deduplication module passed\n")
 except Exception as e:
     print(f"[FAIL] Deduplication test failed: {e}\n")